@@ -10,19 +10,29 @@ Features:
 - Message history included for richer context
 - Session reset commands (!reset, !clear, !new)
 - Delegation status messages when agents hand off to specialists
+- Agent card and A2A client cached across messages (refreshed on TTL or error)
+- Channels processed in parallel, messages within a channel in order
+- Responses streamed into Discord as the agent produces them
+- Sessions kept in a bounded store, optionally persisted in SQLite across restarts
 """
 
 import asyncio
 import logging
 import os
+import sqlite3
 import sys
-from typing import Callable, Coroutine
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Coroutine, Protocol
 from uuid import uuid4
 
 import discord
 import httpx
+from a2a.client import Client as A2AClient
 from a2a.client import ClientConfig, ClientFactory
 from a2a.client.card_resolver import A2ACardResolver
+from a2a.client.errors import A2AClientError, A2AClientJSONError
 from a2a.types import (
     DataPart,
     Message,
@@ -36,9 +46,12 @@ from a2a.types import (
 from a2a.utils.artifact import get_artifact_text
 from a2a.utils.message import get_message_text
 from discord.ext import commands
+from pydantic import ValidationError
 
 # Type alias for status callback
 StatusCallback = Callable[[str], Coroutine[None, None, None]]
+# Type alias for streamed response callback (receives the full text so far)
+TextCallback = Callable[[str], Coroutine[None, None, None]]
 
 # Configure logging
 logging.basicConfig(
@@ -55,9 +68,22 @@ KAGENT_URL = os.environ.get(
 )
 BOT_NAME = os.environ.get("BOT_NAME", "Homelab Agent")
 HISTORY_LIMIT = int(os.environ.get("HISTORY_LIMIT", "5"))
-
-# Session storage: channel_id -> contextId
-channel_contexts: dict[str, str] = {}
+# Seconds before the cached agent card is fetched again
+AGENT_CARD_TTL = float(os.environ.get("AGENT_CARD_TTL", "300"))
+# A2A calls in flight across all channels
+MAX_CONCURRENT_CALLS = int(os.environ.get("MAX_CONCURRENT_CALLS", "4"))
+# Post response text while the agent is still working, instead of at the end
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "true").lower() == "true"
+# Minimum seconds between edits of a streamed message (Discord allows ~5 per 5s)
+STREAM_EDIT_INTERVAL = float(os.environ.get("STREAM_EDIT_INTERVAL", "1.5"))
+
+# Session storage (channel_id -> contextId): "memory" or "sqlite"
+CONTEXT_STORE = os.environ.get("CONTEXT_STORE", "memory")
+CONTEXT_DB_PATH = os.environ.get("CONTEXT_DB_PATH", "/data/contexts.db")
+# Sessions kept; the least recently used channel is forgotten first
+CONTEXT_MAX_CHANNELS = int(os.environ.get("CONTEXT_MAX_CHANNELS", "1000"))
+# Seconds a channel can stay idle before its session is forgotten (default: 7 days)
+CONTEXT_TTL = float(os.environ.get("CONTEXT_TTL", "604800"))
 
 MAX_MESSAGE_LENGTH = 1900
 
@@ -132,6 +158,22 @@ def format_delegation_message(tool_name: str) -> str:
     return f"Asking {display_name}..."
 
 
+def needs_card_refresh(error: Exception) -> bool:
+    """
+    Check whether an A2A error calls for a fresh agent card and a resend.
+
+    True for connection failures (the request never reached the agent, e.g.
+    kagent-controller restarted) and schema errors (the card or response no
+    longer matches). Timeouts and HTTP status errors are not retried, since the
+    agent may still be working on the message.
+    """
+    connection_errors = (httpx.ConnectError, httpx.RemoteProtocolError)
+    if isinstance(error, connection_errors + (A2AClientJSONError, ValidationError)):
+        return True
+    # The A2A transport wraps httpx errors in A2AClientHTTPError
+    return isinstance(error.__cause__, connection_errors)
+
+
 def ensure_trailing_slash(url: str) -> str:
     """Ensure URL ends with a trailing slash."""
     return url if url.endswith("/") else url + "/"
@@ -157,10 +199,218 @@ def split_by_lines(text: str, max_len: int = MAX_MESSAGE_LENGTH) -> list[str]:
     return chunks if chunks else [""]
 
 
+class ContextStore(Protocol):
+    """Maps Discord channel IDs to A2A contextIds."""
+
+    def get(self, channel_id: str) -> str | None:
+        """Return the channel's contextId, marking the session as used."""
+        ...
+
+    def set(self, channel_id: str, context_id: str) -> None:
+        """Store the channel's contextId, evicting the least recently used sessions."""
+        ...
+
+    def delete(self, channel_id: str) -> bool:
+        """Forget the channel's session. Returns False if it had none."""
+        ...
+
+    def close(self) -> None:
+        """Release the store's resources."""
+        ...
+
+
+class MemoryContextStore:
+    """In-memory context store, bounded by LRU eviction and an idle TTL."""
+
+    def __init__(self, max_channels: int, ttl: float):
+        self.max_channels = max_channels
+        self.ttl = ttl
+        # channel_id -> (contextId, last used), least recently used first
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, channel_id: str) -> str | None:
+        entry = self._entries.get(channel_id)
+        if entry is None:
+            return None
+        context_id, last_used = entry
+        now = time.monotonic()
+        if now - last_used > self.ttl:
+            del self._entries[channel_id]
+            return None
+        self._entries[channel_id] = (context_id, now)
+        self._entries.move_to_end(channel_id)
+        return context_id
+
+    def set(self, channel_id: str, context_id: str) -> None:
+        self._entries[channel_id] = (context_id, time.monotonic())
+        self._entries.move_to_end(channel_id)
+        while len(self._entries) > self.max_channels:
+            self._entries.popitem(last=False)
+
+    def delete(self, channel_id: str) -> bool:
+        return self._entries.pop(channel_id, None) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteContextStore:
+    """
+    Context store in a SQLite database, so sessions survive restarts.
+
+    Bounded like the in-memory store: sessions idle for longer than the TTL
+    and those beyond the channel limit (least recently used first) are
+    deleted whenever a session is stored.
+    """
+
+    def __init__(self, path: str, max_channels: int, ttl: float):
+        self.max_channels = max_channels
+        self.ttl = ttl
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS contexts ("
+            "channel_id TEXT PRIMARY KEY, "
+            "context_id TEXT NOT NULL, "
+            "last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+        count = self._db.execute("SELECT COUNT(*) FROM contexts").fetchone()[0]
+        logger.info(f"Loaded {count} session(s) from {path}")
+
+    def get(self, channel_id: str) -> str | None:
+        row = self._db.execute(
+            "SELECT context_id, last_used FROM contexts WHERE channel_id = ?",
+            (channel_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.ttl:
+            self.delete(channel_id)
+            return None
+        with self._db:
+            self._db.execute(
+                "UPDATE contexts SET last_used = ? WHERE channel_id = ?",
+                (now, channel_id),
+            )
+        return row[0]
+
+    def set(self, channel_id: str, context_id: str) -> None:
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO contexts VALUES (?, ?, ?)",
+                (channel_id, context_id, now),
+            )
+            self._db.execute(
+                "DELETE FROM contexts WHERE last_used < ?", (now - self.ttl,)
+            )
+            self._db.execute(
+                "DELETE FROM contexts WHERE channel_id NOT IN ("
+                "SELECT channel_id FROM contexts ORDER BY last_used DESC LIMIT ?)",
+                (self.max_channels,),
+            )
+
+    def delete(self, channel_id: str) -> bool:
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM contexts WHERE channel_id = ?", (channel_id,)
+            )
+        return cursor.rowcount > 0
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def create_context_store() -> ContextStore:
+    """Create the context store selected by CONTEXT_STORE."""
+    if CONTEXT_STORE == "memory":
+        return MemoryContextStore(CONTEXT_MAX_CHANNELS, CONTEXT_TTL)
+    if CONTEXT_STORE == "sqlite":
+        return SqliteContextStore(CONTEXT_DB_PATH, CONTEXT_MAX_CHANNELS, CONTEXT_TTL)
+    raise ValueError(
+        f"Unknown CONTEXT_STORE {CONTEXT_STORE!r} (expected memory or sqlite)"
+    )
+
+
+class StreamingReply:
+    """
+    Reply to a Discord message with text that is still streaming in.
+
+    The first text is posted right away; later updates edit the last message at
+    most once per STREAM_EDIT_INTERVAL, with intermediate updates coalesced.
+    Once a message fills up, the text is split with split_by_lines and continues
+    in new messages.
+    """
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.sent: list[discord.Message] = []
+        self.first_sent_at: float | None = None
+        self._text = ""
+        self._last_flush = 0.0
+        self._pending: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def update(self, text: str):
+        """Show the response text so far (throttled)."""
+        if not text.strip():
+            return
+        self._text = text
+        if not self.sent:
+            await self._flush()
+        elif self._pending is None:
+            delay = self._last_flush + STREAM_EDIT_INTERVAL - time.monotonic()
+            self._pending = asyncio.create_task(self._flush_after(max(delay, 0.0)))
+
+    async def finish(self, text: str):
+        """Show the complete response, replacing any pending update."""
+        if self._pending:
+            self._pending.cancel()
+            self._pending = None
+        self._text = text
+        await self._flush()
+
+    async def abort(self):
+        """Mark the streamed text as incomplete, replacing any pending update."""
+        if self._pending:
+            self._pending.cancel()
+            self._pending = None
+        if not self.sent:
+            return
+        self._text = self._text.rstrip() + "\n\n*(response interrupted)*"
+        await self._flush()
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._pending = None
+        await self._flush()
+
+    async def _flush(self):
+        """Bring the posted messages in line with the current text."""
+        async with self._lock:
+            chunks = split_by_lines(self._text)
+            try:
+                for i, chunk in enumerate(chunks):
+                    if i < len(self.sent):
+                        if self.sent[i].content != chunk:
+                            self.sent[i] = await self.sent[i].edit(content=chunk)
+                    elif i == 0:
+                        reply = await self.message.reply(chunk, mention_author=False)
+                        self.sent.append(reply)
+                        self.first_sent_at = time.monotonic()
+                    else:
+                        self.sent.append(await self.message.channel.send(chunk))
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to update streamed response: {e}")
+            self._last_flush = time.monotonic()
+
+
 class DiscordBridge(commands.Bot):
     """Discord bot that bridges messages to kagent via A2A."""
 
-    def __init__(self):
+    def __init__(self, contexts: ContextStore):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
@@ -172,8 +422,18 @@ class DiscordBridge(commands.Bot):
             description=f"{BOT_NAME} - Powered by kagent",
         )
 
-        self.processing_lock = asyncio.Lock()
+        # One message at a time per channel, keeping replies and contextIds in order;
+        # locks are dropped once no message of the channel is pending
+        self._channel_locks: dict[str, asyncio.Lock] = {}
+        self._channel_pending: Counter[str] = Counter()
+        self._call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
         self._httpx_client: httpx.AsyncClient | None = None
+        self.contexts = contexts
+
+        # Agent card and A2A client, shared by all messages
+        self._agent_client: A2AClient | None = None
+        self._agent_card_fetched_at = 0.0
+        self._agent_client_lock = asyncio.Lock()
 
     async def setup_hook(self):
         """Called when the bot is starting up."""
@@ -182,6 +442,12 @@ class DiscordBridge(commands.Bot):
         # Longer timeout for multi-agent delegation chains
         self._httpx_client = httpx.AsyncClient(timeout=300.0)
 
+        # Warm the agent card so the first message doesn't pay for it
+        try:
+            await self._get_agent_client()
+        except (A2AClientError, httpx.HTTPError) as e:
+            logger.warning(f"Could not fetch agent card yet, will retry on demand: {e}")
+
     async def on_ready(self):
         """Called when the bot is ready."""
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
@@ -225,11 +491,89 @@ class DiscordBridge(commands.Bot):
             logger.warning(f"Failed to fetch channel history: {e}")
             return ""
 
+    @asynccontextmanager
+    async def _channel_turn(self, channel_id: str) -> AsyncIterator[None]:
+        """Wait for earlier messages of the same channel to finish."""
+        lock = self._channel_locks.setdefault(channel_id, asyncio.Lock())
+        self._channel_pending[channel_id] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._channel_pending[channel_id] -= 1
+            if not self._channel_pending[channel_id]:
+                del self._channel_pending[channel_id]
+                del self._channel_locks[channel_id]
+
+    async def _get_agent_client(self, refresh: bool = False) -> A2AClient:
+        """
+        Return the cached A2A client, fetching the agent card when needed.
+
+        The card is fetched again once it is older than AGENT_CARD_TTL. If that
+        refresh fails, the existing client stays in use until the next attempt.
+
+        Args:
+            refresh: Fetch the card even if the cached one is still fresh
+        """
+        async with self._agent_client_lock:
+            age = time.monotonic() - self._agent_card_fetched_at
+            if self._agent_client and not refresh and age < AGENT_CARD_TTL:
+                return self._agent_client
+
+            # Ensure URL has trailing slash to avoid 301 redirects
+            resolver = A2ACardResolver(
+                httpx_client=self._httpx_client,
+                base_url=ensure_trailing_slash(KAGENT_URL),
+            )
+            try:
+                agent_card = await resolver.get_agent_card()
+            except (A2AClientError, httpx.HTTPError) as e:
+                if not self._agent_client or refresh:
+                    raise
+                logger.warning(f"Agent card refresh failed, keeping cached card: {e}")
+                return self._agent_client
+
+            logger.info(f"Fetched agent card: {agent_card.name}")
+            config = ClientConfig(httpx_client=self._httpx_client)
+            self._agent_client = ClientFactory(config=config).create(card=agent_card)
+            self._agent_card_fetched_at = time.monotonic()
+            return self._agent_client
+
+    async def _send_to_agent(self, a2a_message: Message) -> AsyncIterator:
+        """
+        Send a message through the cached A2A client and yield its events.
+
+        If the call fails with a connection or schema error (see
+        needs_card_refresh) before the first event, the card and client are
+        refreshed and the message is sent once more. Failures after events arrived
+        are not retried, since that would repeat work the agent has already done;
+        the card is refreshed on the next message instead.
+        """
+        client = await self._get_agent_client()
+        received = False
+        try:
+            async for event in client.send_message(a2a_message):
+                received = True
+                yield event
+            return
+        except (A2AClientError, httpx.HTTPError, ValidationError) as e:
+            if not needs_card_refresh(e):
+                raise
+            if received:
+                self._agent_card_fetched_at = 0.0
+                raise
+            logger.warning(f"A2A call failed, refreshing agent card and retrying: {e}")
+
+        client = await self._get_agent_client(refresh=True)
+        async for event in client.send_message(a2a_message):
+            yield event
+
     async def _call_agent(
         self,
         message: str,
         channel_id: str,
         status_callback: StatusCallback | None = None,
+        text_callback: TextCallback | None = None,
     ) -> str:
         """
         Call the kagent agent via A2A and return the response.
@@ -238,23 +582,11 @@ class DiscordBridge(commands.Bot):
             message: The message to send to the agent
             channel_id: Discord channel ID for session tracking
             status_callback: Optional async callback for delegation status updates
+            text_callback: Optional async callback with the response text so far,
+                called whenever more text arrives
         """
-        # Ensure URL has trailing slash to avoid 301 redirects
-        base_url = ensure_trailing_slash(KAGENT_URL)
-
-        # Fetch agent card and create client
-        resolver = A2ACardResolver(
-            httpx_client=self._httpx_client,
-            base_url=base_url,
-        )
-        agent_card = await resolver.get_agent_card()
-        logger.debug(f"Got agent card: {agent_card.name}")
-
-        config = ClientConfig(httpx_client=self._httpx_client)
-        client = ClientFactory(config=config).create(card=agent_card)
-
         # Get existing context for session continuity
-        existing_context_id = channel_contexts.get(channel_id)
+        existing_context_id = self.contexts.get(channel_id)
         if existing_context_id:
             logger.debug(f"Using existing context for channel {channel_id}")
 
@@ -276,7 +608,7 @@ class DiscordBridge(commands.Bot):
         active_delegations: set[str] = set()
 
         try:
-            async for event in client.send_message(a2a_message):
+            async for event in self._send_to_agent(a2a_message):
                 logger.debug(f"A2A event: {type(event).__name__}")
 
                 # Handle Message objects directly
@@ -285,6 +617,8 @@ class DiscordBridge(commands.Bot):
                     if text:
                         logger.debug(f"Message text: {text[:100]}...")
                         response_text.append(text)
+                        if text_callback:
+                            await text_callback("\n".join(response_text))
 
                 # Handle (Task, UpdateEvent) tuples
                 elif isinstance(event, tuple) and len(event) >= 2:
@@ -327,6 +661,8 @@ class DiscordBridge(commands.Bot):
                         if text:
                             logger.debug(f"Artifact text: {text[:100]}...")
                             response_text.append(text)
+                            if text_callback:
+                                await text_callback("\n".join(response_text))
 
                     # TaskStatusUpdateEvent - log important states
                     elif isinstance(update_event, TaskStatusUpdateEvent):
@@ -350,7 +686,7 @@ class DiscordBridge(commands.Bot):
         # Store contextId for session continuity
         if new_context_id:
             logger.debug(f"Storing context for channel {channel_id}")
-            channel_contexts[channel_id] = new_context_id
+            self.contexts.set(channel_id, new_context_id)
 
         if response_text:
             return "\n".join(response_text)
@@ -373,8 +709,11 @@ class DiscordBridge(commands.Bot):
 
         # Handle session reset commands
         if content.lower() in ["!reset", "!clear", "!new"]:
-            if channel_id in channel_contexts:
-                del channel_contexts[channel_id]
+            # Wait for a reply in progress, or it would store its context
+            # again right after the reset
+            async with self._channel_turn(channel_id):
+                cleared = self.contexts.delete(channel_id)
+            if cleared:
                 await message.reply("Session cleared. Starting fresh.")
                 logger.info(f"Session reset for channel {channel_id}")
             else:
@@ -385,7 +724,7 @@ class DiscordBridge(commands.Bot):
         should_respond = await self._should_respond(message)
 
         if should_respond:
-            async with self.processing_lock:
+            async with self._channel_turn(channel_id):
                 await self._process_message(message)
 
         await self.process_commands(message)
@@ -415,8 +754,6 @@ class DiscordBridge(commands.Bot):
 
     async def _process_message(self, message: discord.Message):
         """Process a message and generate a response."""
-        import time
-
         start_time = time.monotonic()
         preview = (
             message.content[:50] + "..."
@@ -441,6 +778,8 @@ class DiscordBridge(commands.Bot):
             except Exception as e:
                 logger.warning(f"Failed to send status message: {e}")
 
+        streamer = StreamingReply(message) if STREAM_RESPONSES else None
+
         async with message.channel.typing():
             try:
                 # Clean the message content (remove bot mention)
@@ -465,12 +804,19 @@ class DiscordBridge(commands.Bot):
                 logger.info(f"[Bridge->kagent] Sending: {content[:100]}")
 
                 # Call kagent via A2A with status callback
-                agent_start = time.monotonic()
-                response = await self._call_agent(
-                    message=prompt,
-                    channel_id=channel_id,
-                    status_callback=send_status,
-                )
+                if self._call_slots.locked():
+                    logger.info(
+                        f"{MAX_CONCURRENT_CALLS} A2A calls in flight, "
+                        f"#{message.channel.name} waits for a free slot"
+                    )
+                async with self._call_slots:
+                    agent_start = time.monotonic()
+                    response = await self._call_agent(
+                        message=prompt,
+                        channel_id=channel_id,
+                        status_callback=send_status,
+                        text_callback=streamer.update if streamer else None,
+                    )
                 agent_time = time.monotonic() - agent_start
                 logger.info(
                     f"[kagent->Bridge] Response received in {agent_time:.2f}s "
@@ -484,8 +830,16 @@ class DiscordBridge(commands.Bot):
                     except Exception as e:
                         logger.debug(f"Failed to delete status message: {e}")
 
-                # Send response
-                await self._send_response(message, response)
+                # Send response (or the rest of it, when streaming)
+                if streamer:
+                    if streamer.first_sent_at is not None:
+                        first_time = streamer.first_sent_at - start_time
+                        logger.info(
+                            f"[Bridge->Discord] First content after {first_time:.2f}s"
+                        )
+                    await streamer.finish(response)
+                else:
+                    await self._send_response(message, response)
 
                 total_time = time.monotonic() - start_time
                 logger.info(
@@ -503,6 +857,10 @@ class DiscordBridge(commands.Bot):
                     except Exception:
                         pass
 
+                # Otherwise the partial streamed text reads like a finished answer
+                if streamer:
+                    await streamer.abort()
+
                 await message.reply(
                     "I encountered an error. Please try again.",
                     mention_author=False,
@@ -528,6 +886,7 @@ class DiscordBridge(commands.Bot):
         """Clean up resources."""
         if self._httpx_client:
             await self._httpx_client.aclose()
+        self.contexts.close()
         await super().close()
 
 
@@ -537,7 +896,13 @@ async def main():
         logger.error("DISCORD_TOKEN environment variable is required")
         sys.exit(1)
 
-    bot = DiscordBridge()
+    try:
+        contexts = create_context_store()
+    except (ValueError, sqlite3.Error) as e:
+        logger.error(f"Cannot open context store: {e}")
+        sys.exit(1)
+
+    bot = DiscordBridge(contexts)
 
     try:
         await bot.start(DISCORD_TOKEN)
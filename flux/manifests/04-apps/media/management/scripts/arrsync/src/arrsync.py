@@ -9,7 +9,8 @@ to ensure filenames reflect current codec information after transcoding operatio
 The script:
 1. Lists all items (series/movies/artists) from each *arr service
 2. For each item, triggers a refresh command to rescan files and update metadata
-3. For each item, triggers a rename command to update filenames according to naming scheme
+3. For each item, checks the rename preview and, only if files would change, triggers a
+   rename command to update filenames according to naming scheme
 
 This ensures that after transcoding, the *arr applications recognize the new codec
 and don't attempt unnecessary "upgrades" due to outdated filename information.
@@ -21,22 +22,42 @@ API Versions:
 """
 
 import argparse
+import codecs
+import hashlib
+import json
 import logging
 import os
+import queue
+import re
+import signal
 import sys
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+import metrics
+from commands import AdaptiveLimiter, CommandTracker
+from drift import drifted_files
+from signalr import SignalRListener
+from state import StateStore
 
 # Load .env file if it exists (for local development)
 # The .env file should be in the same directory as this script (src/)
 env_file = Path(__file__).parent / ".env"
 if env_file.exists():
+    from dotenv import load_dotenv  # local development only, kept out of the pods' startup
+
     load_dotenv(env_file)
 
 # Configure logging with timestamp and level
@@ -47,6 +68,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Albums per GET trackfile?albumId=... request when Lidarr builds its track file index
+TRACKFILE_ALBUMS_PER_REQUEST = 100
+
+# Recent imports read from Sonarr's history to order series by their newest episode file
+HISTORY_PAGE_SIZE = 1000
+
 
 @dataclass
 class ArrConfig:
@@ -66,6 +93,192 @@ class ArrConfig:
     api_version: str
 
 
+@dataclass
+class SyncOptions:
+    """
+    Tuning options for a sync run.
+
+    Attributes:
+        concurrency: Maximum number of work units processed (and commands in flight) at once
+        batch_size: Items per refresh/rename command for services whose commands accept ID lists
+        full: Sync every item even if a state store says its files are unchanged
+        resume: Skip items a previous, interrupted run already completed (needs a state store)
+        checkpoint_ttl_hours: Ignore checkpoints older than this when resuming
+        order: "recent" to sync items with the newest files first, "library" for API order
+        shard_index: Which partition of the library this process syncs (0-based)
+        shard_count: Number of partitions the library is split into (see shard_of)
+        completion: How command completion is detected: "poll" or "signalr" (push, with polling fallback)
+        drift_only: Only sync items whose file names disagree with their detected codecs (see drift.py)
+        adaptive: Adjust the number of units in flight to the server's command queue, up to `concurrency`
+        pipeline: Refresh the next units while earlier ones are renamed (refresh and rename stages)
+    """
+
+    concurrency: int = 1
+    batch_size: int = 1
+    full: bool = False
+    resume: bool = False
+    checkpoint_ttl_hours: float = 12.0
+    order: str = "recent"
+    shard_index: int = 0
+    shard_count: int = 1
+    completion: str = "poll"
+    drift_only: bool = False
+    adaptive: bool = False
+    pipeline: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class ArrItem:
+    """
+    Compact projection of a series/movie/artist from the listing endpoint.
+
+    Only the fields arrSync needs are kept, so a large library costs a few hundred
+    bytes per item instead of the full API object (seasons, images, statistics...).
+
+    Attributes:
+        id: Item ID
+        name: Display name for logs and reports
+        path: Item folder on the *arr server
+        last_modified: ISO 8601 timestamp of the newest known file change (or when added)
+        fingerprint: File fingerprint when the listing embeds file details (Radarr), else None
+        drift: Codec drift of the embedded file details, as (file name, description) pairs
+            (Radarr), else None; see drift.py
+    """
+
+    id: int
+    name: str
+    path: str
+    last_modified: str
+    fingerprint: str | None = None
+    drift: tuple[tuple[str, str], ...] | None = None
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Incrementally decode a top-level JSON array, yielding one element at a time.
+
+    Only the undecoded tail of the response is buffered, so memory stays bounded by
+    the largest single element rather than the whole document.
+
+    Args:
+        chunks: Raw response body chunks (e.g., Response.iter_content())
+
+    Yields:
+        Decoded array elements
+
+    Raises:
+        ValueError: If the body is not a JSON array or ends prematurely
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+    chunk_iter = iter(chunks)
+
+    while True:
+        # Skip whitespace and separators between elements
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Element is split across chunks; read more unless the body has ended
+                if exhausted:
+                    raise
+            else:
+                yield element
+                position = end
+                continue
+
+        if exhausted:
+            raise ValueError("Unexpected end of JSON array")
+        # Drop consumed text before growing the buffer
+        buffer = buffer[position:]
+        position = 0
+        chunk = next(chunk_iter, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def parse_timestamp(value: str | None) -> float:
+    """
+    Convert an *arr ISO 8601 timestamp to a POSIX timestamp for ordering.
+
+    Args:
+        value: Timestamp such as "2024-05-01T12:00:00Z" (.NET may add 7 fractional digits)
+
+    Returns:
+        Seconds since the epoch, or 0.0 if the value is missing or malformed
+    """
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def shard_of(item_id: int, shard_count: int) -> int:
+    """
+    Assign an item to a shard.
+
+    Uses a cryptographic hash rather than hash() (salted per process) or a plain
+    modulo (sensitive to ID patterns), so every pod computes the same balanced
+    partition.
+
+    Args:
+        item_id: Item ID
+        shard_count: Number of shards
+
+    Returns:
+        Shard index in [0, shard_count)
+    """
+    digest = hashlib.sha256(str(item_id).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def fingerprint_files(files: list[dict[str, Any]]) -> str:
+    """
+    Build a stable fingerprint of an item's media files.
+
+    Covers the fields that change when tdarr rewrites a file and the *arr service
+    rescans it: file ID (replaced files get a new one), size, dateAdded and the
+    detected codecs. Order-independent so API ordering changes don't cause resyncs.
+
+    Args:
+        files: Episode/movie/track file objects from the *arr API
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    entries = sorted(
+        (
+            file.get("id", 0),
+            file.get("size", 0),
+            file.get("dateAdded", ""),
+            (file.get("mediaInfo") or {}).get("videoCodec", ""),
+            (file.get("mediaInfo") or {}).get("audioCodec", ""),
+        )
+        for file in files
+    )
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
 class ArrClient(ABC):
     """
     Base client for *arr applications.
@@ -77,24 +290,84 @@ class ArrClient(ABC):
     The client:
     - Manages HTTP session with API key authentication
     - Provides methods for listing items, refreshing, and renaming
-    - Handles command execution and status polling
+    - Handles command execution and batched status polling
     - Supports dry-run mode for testing without making changes
+    - Processes items concurrently with a bounded number of in-flight commands
+    - Groups items into multi-ID commands where the service supports it
+    - Skips items whose files are unchanged since the last sync (with a state store)
+    - Checkpoints completed items per phase so interrupted runs can resume
     """
 
-    def __init__(self, config: ArrConfig, dry_run: bool = False):
+    # Whether refresh/rename commands accept a list of item IDs (see refresh_items/rename_items)
+    supports_batch = False
+    # Listing endpoint for the service's items (e.g., "series")
+    item_endpoint = ""
+
+    def __init__(
+        self,
+        config: ArrConfig,
+        dry_run: bool = False,
+        options: SyncOptions | None = None,
+        state: StateStore | None = None,
+        pool: threading.Semaphore | None = None,
+    ):
         """
         Initialize the *arr client.
 
         Args:
             config: Service configuration (URL, API key, version)
             dry_run: If True, log actions without executing API calls
+            options: Concurrency and batching options (defaults to one item at a time)
+            state: Fingerprint store enabling incremental syncs (None syncs everything)
+            pool: Worker slots shared by every instance of a run; each work unit holds one
+                in addition to the instance's own concurrency limit (None: no shared limit)
         """
         self.config = config
         self.dry_run = dry_run
+        self.options = options or SyncOptions()
+        self.state = state
+        self.pool = pool
+        # Outcome of the items synced by this client, for the run summary
+        self.synced_count = 0
+        self.failed_count = 0
+        # Items a resumed run refreshed before it was interrupted (see _apply_checkpoint)
+        self._refreshed_ids: set[int] = set()
         # Create persistent session for connection pooling
         self.session = requests.Session()
+        # Size the connection pool to the worker count so concurrent workers don't
+        # discard and re-open connections (urllib3 defaults to 10 per host)
+        adapter = HTTPAdapter(pool_maxsize=max(self.options.concurrency, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         # All *arr APIs use X-Api-Key header for authentication
         self.session.headers.update({"X-Api-Key": config.api_key})
+        # Shared completion tracking for every command this client submits
+        self.commands = CommandTracker(config.name, self._get)
+        self.limiter: AdaptiveLimiter | None = None
+        if self.options.adaptive and self.options.concurrency > 1:
+            self.limiter = AdaptiveLimiter(self.commands, self.options.concurrency)
+        self._listener: SignalRListener | None = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        """
+        Start the SignalR listener before the first command, if push completion is enabled.
+
+        Connecting lazily keeps runs that submit no commands (everything unchanged)
+        from opening a socket at all.
+        """
+        if self.options.completion != "signalr":
+            return
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = SignalRListener(self.config.name, self.config.url, self.config.api_key, self.commands)
+                self._listener.start()
+
+    def close(self) -> None:
+        """Stop background listeners and release HTTP connections."""
+        if self._listener is not None:
+            self._listener.stop()
+        self.session.close()
 
     def _get(self, endpoint: str) -> Any:
         """
@@ -113,10 +386,34 @@ class ArrClient(ABC):
         """
         url = f"{self.config.url}/api/{self.config.api_version}/{endpoint}"
         logger.debug(f"GET {url}")
-        response = self.session.get(url, timeout=30)
+        with self._timed_request("GET", endpoint):
+            response = self.session.get(url, timeout=30)
         response.raise_for_status()
         return response.json()
 
+    def _stream(self, endpoint: str) -> Iterator[dict[str, Any]]:
+        """
+        Make a GET request and decode a JSON array response as it arrives.
+
+        Args:
+            endpoint: API endpoint path returning a JSON array (e.g., "series")
+
+        Yields:
+            Array elements, one at a time
+
+        Raises:
+            requests.HTTPError: If the API request fails
+            ValueError: If response is not a valid JSON array
+        """
+        url = f"{self.config.url}/api/{self.config.api_version}/{endpoint}"
+        logger.debug(f"GET {url} (streaming)")
+        # Time to the response headers; the body is consumed as the caller iterates
+        with self._timed_request("GET", endpoint):
+            response = self.session.get(url, timeout=30, stream=True)
+        with response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(chunk_size=64 * 1024))
+
     def _post_command(self, command: dict[str, Any]) -> dict[str, Any] | None:
         """
         Post a command to the API.
@@ -139,21 +436,31 @@ class ArrClient(ABC):
             logger.info(f"[DRY-RUN] Would send command: {command}")
             return None
 
+        self._ensure_listener()
         url = f"{self.config.url}/api/{self.config.api_version}/command"
         logger.debug(f"POST {url}: {command}")
-        response = self.session.post(url, json=command, timeout=30)
+        with self._timed_request("POST", "command"):
+            response = self.session.post(url, json=command, timeout=30)
         response.raise_for_status()
         return response.json()
 
-    def _wait_for_command(self, command_id: int, timeout: int = 300) -> bool:
+    def _timed_request(self, method: str, endpoint: str) -> AbstractContextManager[None]:
+        """Time an API request, labelled by its first path segment (e.g., "rename" for rename?seriesId=1)."""
+        resource = endpoint.split("?", 1)[0].split("/", 1)[0]
+        return metrics.timer(
+            "arrsync_http_request_duration_seconds", service=self.config.name, method=method, endpoint=resource
+        )
+
+    def _wait_for_command(self, command: dict[str, Any], timeout: int = 300) -> bool:
         """
         Wait for an asynchronous command to complete.
 
-        *arr commands execute asynchronously. This method polls the command status
-        until it completes, fails, or times out.
+        *arr commands execute asynchronously. Completion is resolved by the client's
+        CommandTracker, which polls the command list once per tick for all commands
+        in flight instead of one request per command every few seconds.
 
         Args:
-            command_id: ID of the command to monitor (from _post_command response)
+            command: Command object returned by _post_command
             timeout: Maximum time to wait in seconds (default: 5 minutes)
 
         Returns:
@@ -162,37 +469,156 @@ class ArrClient(ABC):
         if self.dry_run:
             return True
 
-        start_time = time.time()
-        # Poll every 2 seconds until command completes or timeout
-        while time.time() - start_time < timeout:
-            status = self._get(f"command/{command_id}")
-            state = status.get("status", "unknown")
+        command_id = command["id"]
+        command_name = command.get("name") or command.get("commandName") or "unknown"
+        status = self.commands.wait(command, timeout)
+        if status is None:
+            metrics.inc("arrsync_commands", service=self.config.name, command=command_name, status="timeout")
+            logger.error(f"Command {command_id} timed out after {timeout}s")
+            return False
 
-            if state == "completed":
-                return True
-            elif state in ("failed", "aborted"):
-                error_msg = status.get("message", "Unknown error")
-                exception = status.get("exception", "")
-                if exception:
-                    # Extract the main error message from exception (first line)
-                    exception_lines = exception.split("\n")
-                    if exception_lines:
-                        error_msg = f"{error_msg}: {exception_lines[0]}"
-                logger.error(f"Command {command_id} {state}: {error_msg}")
-                return False
-
-            time.sleep(2)
-
-        logger.error(f"Command {command_id} timed out after {timeout}s")
+        state = status.get("status", "unknown")
+        self._record_command_timing(command_name, status)
+        metrics.inc("arrsync_commands", service=self.config.name, command=command_name, status=state)
+        if state == "completed":
+            return True
+
+        error_msg = status.get("message", "Unknown error")
+        exception = status.get("exception", "")
+        if exception:
+            # Extract the main error message from exception (first line)
+            exception_lines = exception.split("\n")
+            if exception_lines:
+                error_msg = f"{error_msg}: {exception_lines[0]}"
+        logger.error(f"Command {command_id} {state}: {error_msg}")
         return False
 
-    @abstractmethod
-    def list_items(self) -> list[dict[str, Any]]:
+    def _record_command_timing(self, command_name: str, status: dict[str, Any]) -> None:
+        """
+        Split a finished command's time into queue wait and execution, from the server's timestamps.
+
+        Args:
+            command_name: Command name (e.g., "RefreshSeries")
+            status: Final command status with "queued", "started" and "ended" timestamps
+        """
+        queued = parse_timestamp(status.get("queued"))
+        started = parse_timestamp(status.get("started"))
+        ended = parse_timestamp(status.get("ended"))
+        if queued and started:
+            metrics.observe(
+                "arrsync_command_queue_seconds", started - queued, service=self.config.name, command=command_name
+            )
+        if started and ended:
+            metrics.observe(
+                "arrsync_command_execution_seconds", ended - started, service=self.config.name, command=command_name
+            )
+
+    def iter_items(self) -> Iterator[ArrItem]:
+        """
+        Stream all items from the service as compact records.
+
+        The listing response is decoded element by element and projected down to
+        ArrItem, so the full API objects are never held in memory together.
+
+        Yields:
+            One ArrItem per series/movie/artist
+        """
+        for raw in self._stream(self.item_endpoint):
+            yield self._project(raw)
+
+    def list_items(self) -> list[ArrItem]:
         """
         List all items from the service.
 
         Returns:
-            List of item dictionaries, each containing at least an "id" field
+            List of compact item records
+        """
+        return list(self.iter_items())
+
+    def _project(self, raw: dict[str, Any]) -> ArrItem:
+        """
+        Reduce a raw API object from the listing endpoint to an ArrItem.
+
+        Args:
+            raw: Item dictionary from the API
+
+        Returns:
+            Compact item record
+        """
+        return ArrItem(
+            id=raw["id"],
+            name=self._get_item_name(raw),
+            path=raw.get("path", ""),
+            last_modified=self._last_modified(raw),
+            fingerprint=self._embedded_fingerprint(raw),
+            drift=self._embedded_drift(raw),
+        )
+
+    def item_from_event(self, payload: dict[str, Any]) -> ArrItem | None:
+        """
+        Extract the item a Connect webhook event is about.
+
+        Sonarr, Radarr and Lidarr webhook payloads carry a trimmed-down copy of the
+        item under the same key as the listing endpoint ("series", "movie", "artist").
+
+        Args:
+            payload: Webhook request body
+
+        Returns:
+            Item, or None if the event is not about a single item (e.g., Health)
+        """
+        raw = payload.get(self.item_endpoint)
+        if not isinstance(raw, dict) or "id" not in raw:
+            return None
+        # Radarr's webhook movie uses folderPath instead of path
+        return self._project({"path": raw.get("folderPath", ""), **raw})
+
+    def _last_modified(self, raw: dict[str, Any]) -> str:
+        """
+        Best timestamp of the item's latest file change available in the listing.
+
+        Args:
+            raw: Item dictionary from the API
+
+        Returns:
+            ISO 8601 timestamp, or an empty string if unknown
+        """
+        return raw.get("added", "")
+
+    def _embedded_fingerprint(self, raw: dict[str, Any]) -> str | None:
+        """
+        Fingerprint an item from file details embedded in the listing, if any.
+
+        Args:
+            raw: Item dictionary from the API
+
+        Returns:
+            Fingerprint, or None if the listing doesn't include file details
+        """
+        return None
+
+    def _embedded_drift(self, raw: dict[str, Any]) -> tuple[tuple[str, str], ...] | None:
+        """
+        Codec drift of file details embedded in the listing, avoiding a request per item.
+
+        Args:
+            raw: Item dictionary from the listing endpoint
+
+        Returns:
+            Drifted files, or None if the listing doesn't include file details
+        """
+        return None
+
+    @abstractmethod
+    def list_files(self, item_id: int) -> list[dict[str, Any]]:
+        """
+        List the media files (episode/movie/track files) belonging to an item.
+
+        Args:
+            item_id: ID of the series/movie/artist
+
+        Returns:
+            List of file dictionaries including size, dateAdded and mediaInfo
         """
         pass
 
@@ -231,6 +657,56 @@ class ArrClient(ABC):
         """
         pass
 
+    def refresh_items(self, item_ids: list[int]) -> bool:
+        """
+        Refresh several items with a single command.
+
+        Only meaningful when supports_batch is True; the default handles the
+        single-item case so callers can use one code path.
+
+        Args:
+            item_ids: IDs of the items to refresh
+
+        Returns:
+            True if the command completed successfully, False otherwise
+        """
+        if len(item_ids) != 1:
+            raise NotImplementedError(f"{self.config.name} does not support batched refresh")
+        return self.refresh_item(item_ids[0])
+
+    def rename_items(self, item_ids: list[int]) -> bool:
+        """
+        Rename files for several items with a single command.
+
+        Only meaningful when supports_batch is True; the default handles the
+        single-item case so callers can use one code path.
+
+        Args:
+            item_ids: IDs of the items whose files should be renamed
+
+        Returns:
+            True if the command completed successfully, False otherwise
+        """
+        if len(item_ids) != 1:
+            raise NotImplementedError(f"{self.config.name} does not support batched rename")
+        return self.rename_item(item_ids[0])
+
+    @abstractmethod
+    def preview_rename(self, item_id: int) -> list[dict[str, Any]]:
+        """
+        Preview the file renames the naming scheme would apply to an item.
+
+        Uses the read-only rename endpoint, which returns one entry per file whose
+        current path differs from the configured naming format.
+
+        Args:
+            item_id: ID of the series/movie/artist
+
+        Returns:
+            List of entries with "existingPath" and "newPath" (empty if nothing to rename)
+        """
+        pass
+
     def sync_all(self) -> bool:
         """
         Refresh and rename all items in the service.
@@ -238,7 +714,18 @@ class ArrClient(ABC):
         This is the main sync operation. It:
         1. Lists all items
         2. For each item, refreshes metadata and rescans files
-        3. For each item, renames files to match current naming scheme
+        3. For each item, previews renames and renames files only if any would change
+
+        In dry-run mode nothing is submitted; instead the rename previews for all items
+        are fetched concurrently and logged as a plan.
+
+        With concurrency > 1, up to that many work units are processed at once. Each
+        worker handles one unit end to end, so refresh still happens before rename for
+        every item and at most `concurrency` commands are in flight against the service.
+
+        With batch_size > 1 (Sonarr/Radarr only), a unit is a chunk of items sent as one
+        multi-ID refresh command followed by one multi-ID rename command. A failing batch
+        is bisected until the failure is pinned to individual items.
 
         The operation continues on failure - if any item fails to refresh or rename,
         the failure is logged and processing continues with the next item. This ensures
@@ -246,46 +733,638 @@ class ArrClient(ABC):
         database/filesystem mismatches in Lidarr).
 
         Returns:
-            True if all items synced successfully, False if any item failed
+            True if all items synced successfully, False if any item failed
+        """
+        with self._timed_phase("list"):
+            items = self.list_items()
+        if self.options.shard_count > 1:
+            library_count = len(items)
+            items = [item for item in items if shard_of(item.id, self.options.shard_count) == self.options.shard_index]
+            logger.info(
+                f"[{self.config.name}] Shard {self.options.shard_index} of {self.options.shard_count}: "
+                f"{len(items)} of {library_count} items"
+            )
+        total_count = len(items)
+        if self.state is not None and not self.dry_run:
+            items = self._apply_checkpoint(items)
+        with self._timed_phase("prefetch"):
+            self._prefetch(items)
+        if self.state is not None and not self.options.full:
+            with self._timed_phase("filter"):
+                items = self._filter_unchanged(items)
+        if self.options.drift_only:
+            with self._timed_phase("drift"):
+                items = self._filter_drifted(items)
+        if self.options.order == "recent":
+            with self._timed_phase("order"):
+                items = self._prioritize(items)
+
+        if self.dry_run:
+            self._log_rename_plan(items)
+            return True
+
+        failed_items = self.sync_items(items)
+        if len(items) < total_count:
+            logger.info(
+                f"[{self.config.name}] Skipped {total_count - len(items)} unchanged, completed or drift-free items"
+            )
+
+        if failed_items:
+            logger.warning(f"[{self.config.name}] Failed items: {', '.join(failed_items)}")
+            return False
+
+        # Nothing left to resume
+        if self.state is not None:
+            self.state.clear_checkpoints(self.checkpoint_key)
+        metrics.set_gauge("arrsync_last_success_timestamp_seconds", time.time(), service=self.config.name)
+        return True
+
+    def sync_items(self, items: list[ArrItem]) -> list[str]:
+        """
+        Refresh and rename specific items, batched and concurrent per the options.
+
+        Used by sync_all() for the library and by targeted syncs (e.g., watch mode)
+        for items whose files changed. In dry-run mode the rename plan is logged.
+
+        Args:
+            items: Items to sync
+
+        Returns:
+            Labels of failed items (e.g., "Name (refresh)"), empty if all succeeded
+        """
+        if self.dry_run:
+            self._log_rename_plan(items)
+            return []
+
+        batch_size = self.options.batch_size if self.supports_batch else 1
+        if self.options.batch_size > 1 and not self.supports_batch:
+            logger.info(f"[{self.config.name}] Batched commands not supported, processing items individually")
+        batches = [items[start : start + batch_size] for start in range(0, len(items), batch_size)]
+        concurrency = str(self.options.concurrency)
+        if self.limiter is not None:
+            concurrency = f"adaptive {self.limiter.limit}/{self.options.concurrency}"
+        if self.options.pipeline:
+            concurrency += " per stage, pipelined"
+        logger.info(
+            f"[{self.config.name}] Found {len(items)} items to process "
+            f"(batches: {len(batches)}, concurrency: {concurrency})"
+        )
+
+        started = time.monotonic()
+        if self.options.pipeline:
+            failed_items = self._sync_pipelined(batches)
+        else:
+            results = self._map(partial(self._limited, self._sync_batch), batches)
+            failed_items = [failure for batch_failures in results for failure in batch_failures]
+        elapsed = time.monotonic() - started
+
+        success_count = len(items) - len(failed_items)
+        self.synced_count += success_count
+        self.failed_count += len(failed_items)
+        metrics.inc("arrsync_items", success_count, service=self.config.name, result="synced")
+        metrics.inc("arrsync_items", len(failed_items), service=self.config.name, result="failed")
+        if items and elapsed > 0:
+            metrics.set_gauge("arrsync_items_per_second", len(items) / elapsed, service=self.config.name)
+        logger.info(f"[{self.config.name}] Processed {success_count}/{len(items)} items successfully")
+        return failed_items
+
+    def _limited(self, func: Callable[[list[ArrItem]], Any], items: list[ArrItem]) -> Any:
+        """Process a work unit once the adaptive limit and the shared worker pool (if any) have a slot."""
+        with self.limiter.slot() if self.limiter is not None else nullcontext():
+            # Take the shared slot last, so waiting on this instance's own limit doesn't hold one
+            with self.pool if self.pool is not None else nullcontext():
+                return func(items)
+
+    def _sync_pipelined(self, batches: list[list[ArrItem]]) -> list[str]:
+        """
+        Refresh and rename work units in two overlapping stages.
+
+        `concurrency` refresh workers hand refreshed units to `concurrency` rename
+        workers through a bounded queue, so unit N+1 is refreshed while unit N is
+        renamed and both command types keep the server busy. The queue holds at most
+        `concurrency` units: when renames fall behind, refreshes wait instead of
+        running ahead of them (a refreshed but not yet renamed unit is what an
+        interrupted run has to resume). Up to twice `concurrency` commands are in
+        flight; with adaptive concurrency every stage takes a slot, so the limit
+        still bounds the total.
+
+        Args:
+            batches: Work units (single items or batches)
+
+        Returns:
+            Labels of failed items, in completion order
+        """
+        workers = self.options.concurrency
+        pending: queue.SimpleQueue[list[ArrItem]] = queue.SimpleQueue()
+        for batch in batches:
+            pending.put(batch)
+        handoff: queue.Queue[list[ArrItem] | None] = queue.Queue(maxsize=workers)
+        failures: list[str] = []
+        failures_lock = threading.Lock()
+
+        def run_stage(stage: Callable[[list[ArrItem]], Any], phase: str, items: list[ArrItem]) -> Any:
+            try:
+                return self._limited(stage, items)
+            except Exception as e:
+                # A dead worker would stall the other stage on the bounded queue
+                logger.error(f"[{self.config.name}] {phase.capitalize()} stage failed for {len(items)} item(s): {e}")
+                return None
+
+        def refresh_worker() -> None:
+            while True:
+                try:
+                    batch = pending.get_nowait()
+                except queue.Empty:
+                    return
+                logger.info(f"[{self.config.name}] Processing: {', '.join(item.name for item in batch)}")
+                result = run_stage(self._refresh_stage, "refresh", batch)
+                refreshed, batch_failures = result or ([], [self._failure(item, "error") for item in batch])
+                with failures_lock:
+                    failures.extend(batch_failures)
+                if refreshed:
+                    handoff.put(refreshed)
+
+        def rename_worker() -> None:
+            while (batch := handoff.get()) is not None:
+                batch_failures = run_stage(self._rename_stage, "rename", batch)
+                if batch_failures is None:
+                    batch_failures = [self._failure(item, "error") for item in batch]
+                with failures_lock:
+                    failures.extend(batch_failures)
+
+        with ThreadPoolExecutor(max_workers=2 * workers, thread_name_prefix=self.config.name) as executor:
+            refreshers = [executor.submit(refresh_worker) for _ in range(workers)]
+            renamers = [executor.submit(rename_worker) for _ in range(workers)]
+            for future in refreshers:
+                future.result()
+            for _ in renamers:
+                handoff.put(None)
+            for future in renamers:
+                future.result()
+        return failures
+
+    def _timed_phase(self, phase: str) -> AbstractContextManager[None]:
+        """Time a sync phase (list, prefetch, filter, order, refresh, rename)."""
+        return metrics.timer("arrsync_phase_duration_seconds", service=self.config.name, phase=phase)
+
+    def _failure(self, item: ArrItem, phase: str) -> str:
+        """
+        Count a failed item and build its label for the failed-items report.
+
+        Args:
+            item: Item that failed
+            phase: "refresh", "rename" or "error" (a request failed outright)
+
+        Returns:
+            Label such as "Title (refresh)"
+        """
+        metrics.inc("arrsync_item_failures", service=self.config.name, phase=phase)
+        return f"{item.name} ({phase})"
+
+    @property
+    def checkpoint_key(self) -> str:
+        """State key for checkpoints; shards of one service keep separate checkpoints."""
+        if self.options.shard_count > 1:
+            return f"{self.config.name}/shard-{self.options.shard_index}-of-{self.options.shard_count}"
+        return self.config.name
+
+    def _apply_checkpoint(self, items: list[ArrItem]) -> list[ArrItem]:
+        """
+        Resume from the previous run's checkpoint, or start a fresh one.
+
+        With resume enabled, items that completed both phases are dropped and items
+        that were only refreshed skip straight to the rename phase. Otherwise the
+        old checkpoint is discarded so this run records its own.
+
+        Args:
+            items: Items from list_items()
+
+        Returns:
+            Items that still need work
+        """
+        if not self.options.resume:
+            self.state.clear_checkpoints(self.checkpoint_key)
+            return items
+
+        max_age_seconds = self.options.checkpoint_ttl_hours * 3600
+        renamed = self.state.get_checkpoint(self.checkpoint_key, "rename", max_age_seconds)
+        self._refreshed_ids = self.state.get_checkpoint(self.checkpoint_key, "refresh", max_age_seconds) - renamed
+        remaining = [item for item in items if item.id not in renamed]
+        logger.info(
+            f"[{self.config.name}] Resuming: {len(items) - len(remaining)} items already completed, "
+            f"{len(self._refreshed_ids)} already refreshed"
+        )
+        return remaining
+
+    def _checkpoint(self, phase: str, items: list[ArrItem]) -> None:
+        """
+        Record items that completed a phase, so a retried run can skip them.
+
+        Args:
+            phase: "refresh" or "rename"
+            items: Items that completed the phase
+        """
+        if self.state is not None and not self.dry_run and items:
+            self.state.save_checkpoint(self.checkpoint_key, phase, [item.id for item in items])
+
+    def _map(self, func: Callable[[Any], Any], work: list[Any]) -> list[Any]:
+        """
+        Apply a function to each work unit, using up to `concurrency` threads.
+
+        Args:
+            func: Function to call for each unit
+            work: Work units (items or batches)
+
+        Returns:
+            Results in the same order as the input, keeping reports stable
+        """
+        if self.options.concurrency == 1 or len(work) <= 1:
+            return [func(unit) for unit in work]
+        with ThreadPoolExecutor(max_workers=self.options.concurrency, thread_name_prefix=self.config.name) as executor:
+            return list(executor.map(func, work))
+
+    def _log_rename_plan(self, items: list[ArrItem]) -> None:
+        """
+        Fetch rename previews for all items and log them as a dry-run plan.
+
+        The preview reflects the service's current view of the files, i.e. before the
+        refresh a real run would perform, so freshly transcoded files may show up
+        only after the service has rescanned them.
+
+        Args:
+            items: Items that a real run would process
+        """
+        logger.info(f"[DRY-RUN] [{self.config.name}] Would refresh {len(items)} items")
+        previews = self._map(self._safe_preview, items)
+
+        planned_count = 0
+        file_count = 0
+        for item, preview in zip(items, previews, strict=True):
+            if preview is None:
+                logger.info(f"[DRY-RUN] [{self.config.name}] {item.name}: rename preview unavailable")
+                continue
+            if not preview:
+                continue
+            planned_count += 1
+            file_count += len(preview)
+            logger.info(f"[DRY-RUN] [{self.config.name}] {item.name}: {len(preview)} file(s)")
+            for entry in preview:
+                logger.info(f"[DRY-RUN]     {entry.get('existingPath')} -> {entry.get('newPath')}")
+
+        logger.info(
+            f"[DRY-RUN] [{self.config.name}] Rename plan: {planned_count}/{len(items)} items, {file_count} files"
+        )
+
+    def _safe_preview(self, item: ArrItem) -> list[dict[str, Any]] | None:
+        """
+        Preview renames for an item, tolerating request failures.
+
+        Args:
+            item: Item from list_items()
+
+        Returns:
+            Rename preview entries, or None if the preview request failed
+        """
+        try:
+            return self.preview_rename(item.id)
+        except requests.RequestException as e:
+            logger.warning(f"[{self.config.name}] Rename preview failed for {item.name}: {e}")
+            return None
+
+    def _needs_rename(self, item: ArrItem) -> bool:
+        """
+        Check whether renaming an item would change any file.
+
+        Items whose preview can't be fetched are treated as needing a rename, so a
+        preview failure never hides a real rename.
+
+        Args:
+            item: Item from list_items()
+
+        Returns:
+            True if a rename command should be submitted
+        """
+        preview = self._safe_preview(item)
+        if preview == []:
+            logger.debug(f"[{self.config.name}] No renames pending for {item.name}")
+            return False
+        return True
+
+    def _prioritize(self, items: list[ArrItem]) -> list[ArrItem]:
+        """
+        Order items by their newest file, most recent first.
+
+        Freshly imported or transcoded content gets renamed first, which matters
+        when a run is interrupted or time-boxed. Ties keep the API order.
+
+        Args:
+            items: Items to sync
+
+        Returns:
+            Items sorted by descending file recency
+        """
+        file_dates = self._latest_file_dates(items)
+
+        def recency(item: ArrItem) -> float:
+            return max(parse_timestamp(item.last_modified), parse_timestamp(file_dates.get(item.id)))
+
+        ordered = sorted(items, key=recency, reverse=True)
+        if ordered:
+            logger.debug(f"[{self.config.name}] Most recent first: {', '.join(item.name for item in ordered[:5])}")
+        return ordered
+
+    def _latest_file_dates(self, items: list[ArrItem]) -> dict[int, str]:
+        """
+        Newest file dateAdded per item, for items whose listing doesn't carry one.
+
+        Default: none beyond ArrItem.last_modified. Clients override this when the
+        dates can be had in a few requests.
+
+        Args:
+            items: Items to sync
+
+        Returns:
+            Map of item ID to ISO 8601 timestamp (items may be missing)
+        """
+        return {}
+
+    def _prefetch(self, items: list[ArrItem]) -> None:
+        """
+        Bulk-load per-item data before syncing, instead of a request per item.
+
+        Default: nothing to prefetch. Clients override this when the API can list
+        data for the whole library in a few requests.
+
+        Args:
+            items: Items about to be synced
+        """
+
+    def _filter_unchanged(self, items: list[ArrItem]) -> list[ArrItem]:
+        """
+        Drop items whose file fingerprint matches the one stored at their last sync.
+
+        Items whose files can't be listed are kept, so a flaky request never
+        causes an item to be skipped.
+
+        Args:
+            items: Items from list_items()
+
+        Returns:
+            Items that are new or have changed files
+        """
+        stored = self.state.get_fingerprints(self.config.name)
+        if not stored:
+            logger.info(f"[{self.config.name}] No previous sync state, processing all items")
+            return items
+
+        fingerprints = self._map(self._current_fingerprint, items)
+        return [
+            item
+            for item, fingerprint in zip(items, fingerprints, strict=True)
+            if fingerprint is None or stored.get(item.id) != fingerprint
+        ]
+
+    def _filter_drifted(self, items: list[ArrItem]) -> list[ArrItem]:
+        """
+        Keep only items with codec drift: files named for a codec other than the detected one.
+
+        Items whose files can't be listed are kept, so a flaky request never hides drift.
+        Only files the service has rescanned since they were transcoded can show drift.
+
+        Args:
+            items: Items from list_items()
+
+        Returns:
+            Items with at least one drifted file
+        """
+        drift = self._map(self._codec_drift, items)
+        drifted = []
+        for item, files in zip(items, drift, strict=True):
+            if files is None:
+                drifted.append(item)
+            elif files:
+                drifted.append(item)
+                name, description = files[0]
+                more = f" and {len(files) - 1} more files" if len(files) > 1 else ""
+                logger.info(f"[{self.config.name}] Codec drift in {item.name}: {name} ({description}){more}")
+        logger.info(f"[{self.config.name}] {len(drifted)} of {len(items)} items have codec drift")
+        metrics.set_gauge("arrsync_drifted_items", len(drifted), service=self.config.name)
+        return drifted
+
+    def _codec_drift(self, item: ArrItem) -> tuple[tuple[str, str], ...] | None:
+        """
+        Find an item's drifted files.
+
+        Args:
+            item: Item from list_items()
+
+        Returns:
+            (file name, description) per drifted file, or None if the files could not be listed
+        """
+        if item.drift is not None:
+            return item.drift
+        try:
+            return tuple(drifted_files(self._item_files(item)))
+        except requests.RequestException as e:
+            logger.warning(f"[{self.config.name}] Could not check {item.name} for codec drift: {e}")
+            return None
+
+    def _item_files(self, item: ArrItem) -> list[dict[str, Any]]:
+        """List an item's files (overridden where they are prefetched)."""
+        return self.list_files(item.id)
+
+    def _current_fingerprint(self, item: ArrItem) -> str | None:
+        """
+        Fingerprint an item's files as the service currently reports them.
+
+        Args:
+            item: Item from list_items()
+
+        Returns:
+            Fingerprint, or None if the files could not be listed
+        """
+        try:
+            if item.fingerprint is not None:
+                return item.fingerprint
+            return fingerprint_files(self.list_files(item.id))
+        except requests.RequestException as e:
+            logger.warning(f"[{self.config.name}] Could not fingerprint {item.name}: {e}")
+            return None
+
+    def _record_synced(self, items: list[ArrItem]) -> None:
+        """
+        Store post-sync fingerprints for items that refreshed and renamed successfully.
+
+        The fingerprint is taken after the refresh, since the rescan is what
+        updates sizes and codecs in the *arr database.
+
+        Args:
+            items: Items that synced successfully
+        """
+        if self.state is None or self.dry_run:
+            return
+        for item in items:
+            try:
+                fingerprint = fingerprint_files(self.list_files(item.id))
+            except requests.RequestException as e:
+                # Without a stored fingerprint the item is simply synced again next run
+                logger.warning(f"[{self.config.name}] Could not record state for {item.name}: {e}")
+                continue
+            self.state.save_fingerprint(self.config.name, item.id, fingerprint)
+
+    def _sync_batch(self, items: list[ArrItem]) -> list[str]:
+        """
+        Refresh then rename a group of items.
+
+        Args:
+            items: Items from list_items()
+
+        Returns:
+            Failure labels such as "Title (refresh)", empty if every item succeeded
+        """
+        if len(items) == 1:
+            failure = self._sync_item(items[0])
+            if failure:
+                return [failure]
+            self._record_synced(items)
+            return []
+
+        names = ", ".join(item.name for item in items)
+        logger.info(f"[{self.config.name}] Processing batch of {len(items)}: {names}")
+
+        refreshed, failures = self._refresh_stage(items)
+        return failures + self._rename_stage(refreshed)
+
+    def _refresh_stage(self, items: list[ArrItem]) -> tuple[list[ArrItem], list[str]]:
+        """
+        Refresh a group of items with (bisected) multi-ID commands and checkpoint them.
+
+        Args:
+            items: Items from list_items()
+
+        Returns:
+            Items ready to be renamed, and failure labels of the items that failed
+        """
+        # Items refreshed by an interrupted earlier run go straight to renaming
+        to_refresh = [item for item in items if item.id not in self._refreshed_ids]
+        refresh_failed = self._run_bisected(to_refresh, self.refresh_items, "refresh")
+        failures = [self._failure(item, "refresh") for item in refresh_failed]
+
+        # Only rename items whose metadata was refreshed successfully
+        refresh_failed_ids = {item.id for item in refresh_failed}
+        self._checkpoint("refresh", [item for item in to_refresh if item.id not in refresh_failed_ids])
+        return [item for item in items if item.id not in refresh_failed_ids], failures
+
+    def _rename_stage(self, items: list[ArrItem]) -> list[str]:
+        """
+        Rename the refreshed items whose preview shows changes, then checkpoint and fingerprint them.
+
+        Args:
+            items: Items the refresh stage passed on
+
+        Returns:
+            Failure labels of the items that failed
         """
-        items = self.list_items()
-        logger.info(f"[{self.config.name}] Found {len(items)} items to process")
+        pending = [item for item in items if self._needs_rename(item)]
+        rename_failed = self._run_bisected(pending, self.rename_items, "rename")
+        failures = [self._failure(item, "rename") for item in rename_failed]
+
+        rename_failed_ids = {item.id for item in rename_failed}
+        renamed = [item for item in items if item.id not in rename_failed_ids]
+        self._checkpoint("rename", renamed)
+        self._record_synced(renamed)
+        return failures
+
+    def _run_bisected(
+        self,
+        items: list[ArrItem],
+        action: Callable[[list[int]], bool],
+        phase: str,
+    ) -> list[ArrItem]:
+        """
+        Run a multi-ID command, splitting the batch in half whenever it fails.
 
-        failed_items: list[str] = []
+        A single bad item (e.g., a series whose folder is missing) fails the whole
+        command, so the batch is bisected until the failure is isolated. The cost is
+        O(k log n) extra commands for k failing items, instead of falling back to one
+        command per item for the whole batch.
 
-        for item in items:
-            item_id = item["id"]
-            item_name = self._get_item_name(item)
-            logger.info(f"[{self.config.name}] Processing: {item_name} (ID: {item_id})")
+        Args:
+            items: Items to process
+            action: refresh_items or rename_items
+            phase: Phase name for logging ("refresh" or "rename")
 
-            # Refresh first to ensure metadata is up-to-date
-            if not self.refresh_item(item_id):
-                logger.error(f"[{self.config.name}] Failed to refresh: {item_name}")
-                failed_items.append(f"{item_name} (refresh)")
-                continue
+        Returns:
+            Items that failed on their own
+        """
+        if not items:
+            return []
 
-            # Then rename to reflect current state
-            if not self.rename_item(item_id):
-                logger.error(f"[{self.config.name}] Failed to rename: {item_name}")
-                failed_items.append(f"{item_name} (rename)")
-                continue
+        try:
+            with self._timed_phase(phase):
+                succeeded = action([item.id for item in items])
+        except requests.RequestException as e:
+            logger.error(f"[{self.config.name}] {phase.capitalize()} request failed for {len(items)} item(s): {e}")
+            succeeded = False
+
+        if succeeded:
+            return []
+        if len(items) == 1:
+            logger.error(f"[{self.config.name}] Failed to {phase}: {items[0].name}")
+            return items
+
+        logger.warning(f"[{self.config.name}] Batch {phase} of {len(items)} items failed, bisecting")
+        middle = len(items) // 2
+        return self._run_bisected(items[:middle], action, phase) + self._run_bisected(items[middle:], action, phase)
+
+    def _sync_item(self, item: ArrItem) -> str | None:
+        """
+        Refresh then rename a single item.
 
-        success_count = len(items) - len(failed_items)
-        logger.info(f"[{self.config.name}] Processed {success_count}/{len(items)} items successfully")
+        Args:
+            item: Item from list_items()
 
-        if failed_items:
-            logger.warning(f"[{self.config.name}] Failed items: {', '.join(failed_items)}")
-            return False
+        Returns:
+            None on success, otherwise a failure label such as "Title (refresh)"
+        """
+        item_id = item.id
+        item_name = item.name
+        logger.info(f"[{self.config.name}] Processing: {item_name} (ID: {item_id})")
 
-        return True
+        try:
+            # Refresh first to ensure metadata is up-to-date
+            if item_id in self._refreshed_ids:
+                logger.debug(f"[{self.config.name}] {item_name} was refreshed by the interrupted run")
+            else:
+                with self._timed_phase("refresh"):
+                    refreshed = self.refresh_item(item_id)
+                if not refreshed:
+                    logger.error(f"[{self.config.name}] Failed to refresh: {item_name}")
+                    return self._failure(item, "refresh")
+                self._checkpoint("refresh", [item])
+
+            # Then rename to reflect current state, skipping no-op rename commands
+            if self._needs_rename(item):
+                with self._timed_phase("rename"):
+                    renamed = self.rename_item(item_id)
+                if not renamed:
+                    logger.error(f"[{self.config.name}] Failed to rename: {item_name}")
+                    return self._failure(item, "rename")
+            self._checkpoint("rename", [item])
+        except requests.RequestException as e:
+            # A transient HTTP error on one item must not abort the other workers
+            logger.error(f"[{self.config.name}] Request failed for {item_name}: {e}")
+            return self._failure(item, "error")
+
+        return None
 
     @abstractmethod
     def _get_item_name(self, item: dict[str, Any]) -> str:
         """
         Extract the display name from an item dictionary.
 
-        Used for logging and error messages. Each service uses different field names
-        for the item title/name.
+        Used when projecting listing objects to ArrItem. Each service uses different
+        field names for the item title/name.
 
         Args:
             item: Item dictionary from the API
@@ -302,10 +1381,25 @@ class SonarrClient(ArrClient):
 
     Sonarr uses API v3. Endpoints:
     - GET /api/v3/series - List all series
+    - GET /api/v3/rename?seriesId= - Preview pending file renames
     - POST /api/v3/command - Execute commands (RefreshSeries, RenameSeries)
+
+    Both commands accept a "seriesIds" list, so items can be batched.
     """
 
-    def __init__(self, url: str, api_key: str, dry_run: bool = False):
+    supports_batch = True
+    item_endpoint = "series"
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        dry_run: bool = False,
+        options: SyncOptions | None = None,
+        state: StateStore | None = None,
+        name: str = "Sonarr",
+        pool: threading.Semaphore | None = None,
+    ):
         """
         Initialize Sonarr client.
 
@@ -313,13 +1407,39 @@ class SonarrClient(ArrClient):
             url: Sonarr base URL (defaults to cluster internal service)
             api_key: Sonarr API key from Settings → General → Security
             dry_run: Enable dry-run mode
+            options: Concurrency and batching options
+            state: Fingerprint store for incremental syncs
+            name: Instance name (logs, metrics, state keys), e.g. "Sonarr 4K" for a second instance
+            pool: Worker slots shared with other instances
         """
-        config = ArrConfig(name="Sonarr", url=url, api_key=api_key, api_version="v3")
-        super().__init__(config, dry_run)
+        config = ArrConfig(name=name, url=url, api_key=api_key, api_version="v3")
+        super().__init__(config, dry_run, options, state, pool)
 
-    def list_items(self) -> list[dict[str, Any]]:
-        """List all TV series in Sonarr."""
-        return self._get("series")
+    def list_files(self, item_id: int) -> list[dict[str, Any]]:
+        """List episode files for a series."""
+        return self._get(f"episodefile?seriesId={item_id}")
+
+    def _latest_file_dates(self, items: list[ArrItem]) -> dict[int, str]:
+        """
+        Newest episode file import per series, from the import history.
+
+        The series listing only has the date the series was added, so the latest
+        HISTORY_PAGE_SIZE "downloadFolderImported" events are read in one request.
+        Series without a recent import fall back to their added date.
+        """
+        try:
+            history = self._get(
+                f"history?page=1&pageSize={HISTORY_PAGE_SIZE}&sortKey=date&sortDirection=descending&eventType=3"
+            )
+        except requests.RequestException as e:
+            logger.warning(f"[{self.config.name}] Could not read import history, ordering by added date: {e}")
+            return {}
+
+        dates: dict[int, str] = {}
+        for record in history.get("records", []):
+            # Records are newest first, so the first one per series wins
+            dates.setdefault(record.get("seriesId"), record.get("date", ""))
+        return dates
 
     def refresh_item(self, item_id: int) -> bool:
         """
@@ -330,11 +1450,16 @@ class SonarrClient(ArrClient):
         - Rescans series directory for file changes
         - Updates episode file information
         """
-        command = {"name": "RefreshSeries", "seriesIds": [item_id]}
+        return self.refresh_items([item_id])
+
+    def refresh_items(self, item_ids: list[int]) -> bool:
+        """Refresh several series with one RefreshSeries command."""
+        command = {"name": "RefreshSeries", "seriesIds": item_ids}
         result = self._post_command(command)
         if result is None:
             return True  # dry-run
-        return self._wait_for_command(result["id"])
+        # Large batches legitimately run longer than a single-item command
+        return self._wait_for_command(result, timeout=300 * len(item_ids))
 
     def rename_item(self, item_id: int) -> bool:
         """
@@ -344,11 +1469,19 @@ class SonarrClient(ArrClient):
         - Renames all episode files according to configured naming scheme
         - Updates paths if necessary
         """
-        command = {"name": "RenameSeries", "seriesIds": [item_id]}
+        return self.rename_items([item_id])
+
+    def rename_items(self, item_ids: list[int]) -> bool:
+        """Rename files for several series with one RenameSeries command."""
+        command = {"name": "RenameSeries", "seriesIds": item_ids}
         result = self._post_command(command)
         if result is None:
             return True  # dry-run
-        return self._wait_for_command(result["id"])
+        return self._wait_for_command(result, timeout=300 * len(item_ids))
+
+    def preview_rename(self, item_id: int) -> list[dict[str, Any]]:
+        """Preview file renames for a series (GET /rename?seriesId=)."""
+        return self._get(f"rename?seriesId={item_id}")
 
     def _get_item_name(self, item: dict[str, Any]) -> str:
         """Extract series title from Sonarr series object."""
@@ -361,10 +1494,25 @@ class RadarrClient(ArrClient):
 
     Radarr uses API v3. Endpoints:
     - GET /api/v3/movie - List all movies
+    - GET /api/v3/rename?movieId= - Preview pending file renames
     - POST /api/v3/command - Execute commands (RefreshMovie, RenameMovie)
+
+    Both commands accept a "movieIds" list, so items can be batched.
     """
 
-    def __init__(self, url: str, api_key: str, dry_run: bool = False):
+    supports_batch = True
+    item_endpoint = "movie"
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        dry_run: bool = False,
+        options: SyncOptions | None = None,
+        state: StateStore | None = None,
+        name: str = "Radarr",
+        pool: threading.Semaphore | None = None,
+    ):
         """
         Initialize Radarr client.
 
@@ -372,13 +1520,29 @@ class RadarrClient(ArrClient):
             url: Radarr base URL (defaults to cluster internal service)
             api_key: Radarr API key from Settings → General → Security
             dry_run: Enable dry-run mode
+            options: Concurrency and batching options
+            state: Fingerprint store for incremental syncs
+            name: Instance name (logs, metrics, state keys), e.g. "Radarr 4K" for a second instance
+            pool: Worker slots shared with other instances
         """
-        config = ArrConfig(name="Radarr", url=url, api_key=api_key, api_version="v3")
-        super().__init__(config, dry_run)
+        config = ArrConfig(name=name, url=url, api_key=api_key, api_version="v3")
+        super().__init__(config, dry_run, options, state, pool)
+
+    def list_files(self, item_id: int) -> list[dict[str, Any]]:
+        """List movie files for a movie."""
+        return self._get(f"moviefile?movieId={item_id}")
+
+    def _last_modified(self, raw: dict[str, Any]) -> str:
+        """Use the embedded movie file's dateAdded, falling back to when the movie was added."""
+        return (raw.get("movieFile") or {}).get("dateAdded") or raw.get("added", "")
+
+    def _embedded_fingerprint(self, raw: dict[str, Any]) -> str | None:
+        """Fingerprint the movie file embedded in the /movie listing instead of a request per movie."""
+        return fingerprint_files([raw["movieFile"]] if raw.get("movieFile") else [])
 
-    def list_items(self) -> list[dict[str, Any]]:
-        """List all movies in Radarr."""
-        return self._get("movie")
+    def _embedded_drift(self, raw: dict[str, Any]) -> tuple[tuple[str, str], ...] | None:
+        """Check the movie file embedded in the /movie listing for codec drift."""
+        return tuple(drifted_files([raw["movieFile"]] if raw.get("movieFile") else []))
 
     def refresh_item(self, item_id: int) -> bool:
         """
@@ -389,11 +1553,16 @@ class RadarrClient(ArrClient):
         - Rescans movie directory for file changes
         - Updates file information
         """
-        command = {"name": "RefreshMovie", "movieIds": [item_id]}
+        return self.refresh_items([item_id])
+
+    def refresh_items(self, item_ids: list[int]) -> bool:
+        """Refresh several movies with one RefreshMovie command."""
+        command = {"name": "RefreshMovie", "movieIds": item_ids}
         result = self._post_command(command)
         if result is None:
             return True  # dry-run
-        return self._wait_for_command(result["id"])
+        # Large batches legitimately run longer than a single-item command
+        return self._wait_for_command(result, timeout=300 * len(item_ids))
 
     def rename_item(self, item_id: int) -> bool:
         """
@@ -403,11 +1572,19 @@ class RadarrClient(ArrClient):
         - Renames movie files according to configured naming scheme
         - Updates paths if necessary
         """
-        command = {"name": "RenameMovie", "movieIds": [item_id]}
+        return self.rename_items([item_id])
+
+    def rename_items(self, item_ids: list[int]) -> bool:
+        """Rename files for several movies with one RenameMovie command."""
+        command = {"name": "RenameMovie", "movieIds": item_ids}
         result = self._post_command(command)
         if result is None:
             return True  # dry-run
-        return self._wait_for_command(result["id"])
+        return self._wait_for_command(result, timeout=300 * len(item_ids))
+
+    def preview_rename(self, item_id: int) -> list[dict[str, Any]]:
+        """Preview file renames for a movie (GET /rename?movieId=)."""
+        return self._get(f"rename?movieId={item_id}")
 
     def _get_item_name(self, item: dict[str, Any]) -> str:
         """Extract movie title from Radarr movie object."""
@@ -420,13 +1597,27 @@ class LidarrClient(ArrClient):
 
     Lidarr uses API v1 (different from Sonarr/Radarr v3). Endpoints:
     - GET /api/v1/artist - List all artists
+    - GET /api/v1/rename?artistId= - Preview pending file renames
     - POST /api/v1/command - Execute commands (RefreshArtist, RenameFiles)
 
     Note: Lidarr command format differs - RefreshArtist uses "artistId" (singular),
-    while RenameFiles requires fetching track files first and using "files" parameter.
+    while RenameFiles requires the track file IDs in a "files" parameter. Those come
+    from an index of the whole library's track files, built once per run from
+    GET /album and paged GET /trackfile?albumId= requests (see _prefetch).
     """
 
-    def __init__(self, url: str, api_key: str, dry_run: bool = False):
+    item_endpoint = "artist"
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        dry_run: bool = False,
+        options: SyncOptions | None = None,
+        state: StateStore | None = None,
+        name: str = "Lidarr",
+        pool: threading.Semaphore | None = None,
+    ):
         """
         Initialize Lidarr client.
 
@@ -434,13 +1625,182 @@ class LidarrClient(ArrClient):
             url: Lidarr base URL (defaults to cluster internal service)
             api_key: Lidarr API key from Settings → General → Security
             dry_run: Enable dry-run mode
+            options: Concurrency and batching options
+            state: Fingerprint store for incremental syncs
+            name: Instance name (logs, metrics, state keys), e.g. "Lidarr 4K" for a second instance
+            pool: Worker slots shared with other instances
+        """
+        config = ArrConfig(name=name, url=url, api_key=api_key, api_version="v1")
+        super().__init__(config, dry_run, options, state, pool)
+        # Track files per artist ID, projected to the fields arrSync uses; None until prefetched
+        self._track_files: dict[int, list[dict[str, Any]]] | None = None
+        # Artists synced this run whose fingerprints are still to be recorded (see _record_synced)
+        self._synced_artists: list[ArrItem] = []
+        self._synced_lock = threading.Lock()
+
+    def list_files(self, item_id: int) -> list[dict[str, Any]]:
+        """List track files for an artist."""
+        return self._get(f"trackfile?artistId={item_id}")
+
+    def _prefetch(self, items: list[ArrItem]) -> None:
+        """
+        Index the track files of all artists about to be synced.
+
+        Lidarr's track file endpoint needs an artist, album or track file filter, so
+        albums are listed once (their statistics tell which have files at all) and
+        their track files fetched in pages of TRACKFILE_ALBUMS_PER_REQUEST albums.
+        Artists without files end up with an empty entry and are never queried again.
+
+        On failure the index stays unset and track files are listed per artist.
+
+        Args:
+            items: Artists about to be synced
+        """
+        wanted = {item.id for item in items}
+        if not wanted:
+            return
+        try:
+            index, album_count = self._index_track_files(wanted)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"[{self.config.name}] Could not index track files, listing them per artist: {e}")
+            return
+
+        self._track_files = index
+        logger.info(
+            f"[{self.config.name}] Indexed {sum(len(files) for files in index.values())} track files "
+            f"from {album_count} albums in {-(-album_count // TRACKFILE_ALBUMS_PER_REQUEST)} requests"
+        )
+
+    def _index_track_files(self, artist_ids: set[int]) -> tuple[dict[int, list[dict[str, Any]]], int]:
+        """
+        Fetch the track files of some artists through their albums.
+
+        Args:
+            artist_ids: Artists to index
+
+        Returns:
+            Projected track files per artist (an empty list for artists without files),
+            and the number of albums queried
+
+        Raises:
+            requests.RequestException: If an API request fails
+            ValueError: If a response is not valid JSON
+        """
+        album_ids = [
+            album["id"]
+            for album in self._stream("album")
+            if album.get("artistId") in artist_ids and (album.get("statistics") or {}).get("trackFileCount", 1) > 0
+        ]
+        index: dict[int, list[dict[str, Any]]] = {artist_id: [] for artist_id in artist_ids}
+        for start in range(0, len(album_ids), TRACKFILE_ALBUMS_PER_REQUEST):
+            page = album_ids[start : start + TRACKFILE_ALBUMS_PER_REQUEST]
+            query = "&".join(f"albumId={album_id}" for album_id in page)
+            for track_file in self._stream(f"trackfile?{query}"):
+                if track_file.get("artistId") in index:
+                    index[track_file["artistId"]].append(self._project_track_file(track_file))
+        return index, len(album_ids)
+
+    def sync_items(self, items: list[ArrItem]) -> list[str]:
+        """Refresh and rename artists, then record the fingerprints of those that synced in one pass."""
+        try:
+            return super().sync_items(items)
+        finally:
+            self._flush_synced()
+
+    def _record_synced(self, items: list[ArrItem]) -> None:
+        """
+        Queue synced artists for fingerprinting once the run's commands are done.
+
+        Lidarr syncs one artist per command, so fingerprinting each as it finishes
+        would cost a track file request per artist; _flush_synced re-indexes them
+        all with paged album requests instead.
+
+        Args:
+            items: Artists that synced successfully
+        """
+        if self.state is None or self.dry_run:
+            return
+        with self._synced_lock:
+            self._synced_artists.extend(items)
+
+    def _flush_synced(self) -> None:
+        """Store post-sync fingerprints for the queued artists from a fresh track file index."""
+        with self._synced_lock:
+            artists, self._synced_artists = self._synced_artists, []
+        if not artists or self.state is None:
+            return
+        try:
+            index, _ = self._index_track_files({item.id for item in artists})
+        except (requests.RequestException, ValueError) as e:
+            # Without stored fingerprints the artists are simply synced again next run
+            logger.warning(f"[{self.config.name}] Could not record state for {len(artists)} artists: {e}")
+            return
+        if self._track_files is not None:
+            self._track_files.update(index)
+        for item in artists:
+            self.state.save_fingerprint(self.config.name, item.id, fingerprint_files(index[item.id]))
+
+    @staticmethod
+    def _project_track_file(track_file: dict[str, Any]) -> dict[str, Any]:
+        """
+        Keep only the track file fields used for renames and fingerprints.
+
+        Args:
+            track_file: Track file object from the Lidarr API
+
+        Returns:
+            Track file with id, size, dateAdded, path and codecs (when present)
+        """
+        projected = {key: track_file[key] for key in ("id", "size", "dateAdded", "path") if key in track_file}
+        media_info = track_file.get("mediaInfo") or {}
+        projected["mediaInfo"] = {key: media_info[key] for key in ("videoCodec", "audioCodec") if key in media_info}
+        return projected
+
+    def _artist_track_files(self, item_id: int) -> list[dict[str, Any]]:
+        """
+        Track files of an artist, from the prefetched index when available.
+
+        Args:
+            item_id: Artist ID
+
+        Returns:
+            Track file objects
+
+        Raises:
+            requests.RequestException: If the index is unset and the API request fails
         """
-        config = ArrConfig(name="Lidarr", url=url, api_key=api_key, api_version="v1")
-        super().__init__(config, dry_run)
+        if self._track_files is not None:
+            return self._track_files.get(item_id, [])
+        return self.list_files(item_id)
+
+    def _latest_file_dates(self, items: list[ArrItem]) -> dict[int, str]:
+        """Newest track file dateAdded per artist, from the prefetched index."""
+        if self._track_files is None:
+            return {}
+        return {
+            artist_id: max(track_file.get("dateAdded", "") for track_file in track_files)
+            for artist_id, track_files in self._track_files.items()
+            if track_files
+        }
+
+    def _needs_rename(self, item: ArrItem) -> bool:
+        """Skip the rename preview for artists the index shows without track files."""
+        if self._track_files is not None and not self._track_files.get(item.id):
+            logger.debug(f"[{self.config.name}] No track files indexed for {item.name}, skipping rename")
+            return False
+        return super()._needs_rename(item)
 
-    def list_items(self) -> list[dict[str, Any]]:
-        """List all artists in Lidarr."""
-        return self._get("artist")
+    def _current_fingerprint(self, item: ArrItem) -> str | None:
+        """Fingerprint an artist's track files, from the prefetched index when available."""
+        if self._track_files is not None:
+            return fingerprint_files(self._artist_track_files(item.id))
+        return super()._current_fingerprint(item)
+
+    def _item_files(self, item: ArrItem) -> list[dict[str, Any]]:
+        """List an artist's track files, from the prefetched index when available."""
+        if self._track_files is not None:
+            return self._artist_track_files(item.id)
+        return super()._item_files(item)
 
     def refresh_item(self, item_id: int) -> bool:
         """
@@ -457,7 +1817,7 @@ class LidarrClient(ArrClient):
         result = self._post_command(command)
         if result is None:
             return True  # dry-run
-        return self._wait_for_command(result["id"])
+        return self._wait_for_command(result)
 
     def rename_item(self, item_id: int) -> bool:
         """
@@ -468,11 +1828,12 @@ class LidarrClient(ArrClient):
         - Updates paths if necessary
 
         Note: Lidarr's RenameFiles command requires both files (track file IDs) and
-        artistId parameters. We get all track files for the artist first.
+        artistId parameters. The IDs come from the prefetched track file index; a
+        file replaced by the preceding refresh gets a new ID, but Lidarr names
+        imported files itself, so only the stale ID is skipped.
         """
-        # Get all track files for this artist
         try:
-            track_files = self._get(f"trackfile?artistId={item_id}")
+            track_files = self._artist_track_files(item_id)
             if not track_files:
                 logger.debug(f"[{self.config.name}] No track files found for artist {item_id}, skipping rename")
                 return True  # No files to rename, consider it successful
@@ -488,14 +1849,18 @@ class LidarrClient(ArrClient):
             result = self._post_command(command)
             if result is None:
                 return True  # dry-run
-            return self._wait_for_command(result["id"])
+            return self._wait_for_command(result)
         except Exception as e:
             logger.error(f"[{self.config.name}] Error getting track files for rename: {e}")
             return False
 
+    def preview_rename(self, item_id: int) -> list[dict[str, Any]]:
+        """Preview file renames for a artist (GET /rename?artistId=)."""
+        return self._get(f"rename?artistId={item_id}")
+
     def _get_item_name(self, item: dict[str, Any]) -> str:
-        """Extract artist name from Lidarr artist object."""
-        return item.get("artistName", "Unknown")
+        """Extract artist name from Lidarr artist object (webhook payloads use "name")."""
+        return item.get("artistName") or item.get("name", "Unknown")
 
 
 def get_env_or_fail(key: str) -> str:
@@ -521,55 +1886,473 @@ def get_env_or_fail(key: str) -> str:
     return value
 
 
-def run_sonarr(dry_run: bool) -> bool:
+# Client class and default (cluster internal) URL per service; credentials come from <SERVICE>_URL/_API_KEY
+SERVICE_CLIENTS: dict[str, tuple[type[ArrClient], str]] = {
+    "sonarr": (SonarrClient, "http://sonarr.sonarr.svc.cluster.local"),
+    "radarr": (RadarrClient, "http://radarr.radarr.svc.cluster.local"),
+    "lidarr": (LidarrClient, "http://lidarr.lidarr.svc.cluster.local"),
+}
+
+
+def create_client(
+    service: str, dry_run: bool, options: SyncOptions | None = None, state: StateStore | None = None
+) -> ArrClient:
+    """
+    Build a client for a service from its environment variables.
+
+    Args:
+        service: Service key in SERVICE_CLIENTS (e.g., "sonarr")
+        dry_run: If True, preview actions without executing
+        options: Concurrency and batching options
+        state: Fingerprint store for incremental syncs
+
+    Returns:
+        Client for the service
+
+    Exits:
+        sys.exit(1): If the service's API key is not set
+    """
+    client_class, default_url = SERVICE_CLIENTS[service]
+    url = os.environ.get(f"{service.upper()}_URL", default_url)
+    api_key = get_env_or_fail(f"{service.upper()}_API_KEY")
+    return client_class(url, api_key, dry_run, options, state)
+
+
+# Settings an [[instances]] entry can override, and the allowed values of the string ones
+INSTANCE_OPTIONS = ("concurrency", "batch_size", "adaptive", "pipeline", "order", "completion", "drift_only")
+OPTION_CHOICES = {"order": ("recent", "library"), "completion": ("poll", "signalr")}
+TYPE_NAMES = {int: "an integer", bool: "true or false", str: "a string"}
+
+
+@dataclass
+class InstanceConfig:
+    """
+    One *arr instance listed in the config file.
+
+    Attributes:
+        service: Service type, a key of SERVICE_CLIENTS (e.g., "sonarr")
+        name: Unique instance name, used in logs, metrics, state keys and webhook URLs
+        url: Base URL
+        api_key: API key
+        options: Overrides of the run's SyncOptions (e.g., {"concurrency": 4})
+    """
+
+    service: str
+    name: str
+    url: str
+    api_key: str
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RunConfig:
+    """
+    Instances and shared limits from the config file.
+
+    Attributes:
+        instances: Instances to sync
+        workers: Work units in flight across all instances (None: only per-instance limits)
+    """
+
+    instances: list[InstanceConfig]
+    workers: int | None = None
+
+
+@dataclass
+class InstanceResult:
+    """
+    Outcome of one instance's sync, for the combined summary.
+
+    Attributes:
+        succeeded: Whether every item synced
+        synced: Items synced successfully
+        failed: Items that failed
+        seconds: Wall time of the instance's sync
+    """
+
+    succeeded: bool
+    synced: int
+    failed: int
+    seconds: float
+
+
+def instance_slug(name: str) -> str:
+    """
+    Webhook URL segment of an instance: the lowercased name with runs of other characters replaced by "-".
+
+    Args:
+        name: Instance name, e.g. "Sonarr 4K"
+
+    Returns:
+        URL segment, e.g. "sonarr-4k"
+    """
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def load_config(path: Path, service_filter: str | None = None) -> RunConfig:
+    """
+    Load a TOML config file listing any number of instances per service.
+
+    Example:
+
+        workers = 6
+
+        [[instances]]
+        service = "sonarr"
+        url = "http://sonarr.sonarr.svc.cluster.local"
+
+        [[instances]]
+        service = "sonarr"
+        name = "Sonarr 4K"
+        url = "http://sonarr-4k.sonarr.svc.cluster.local"
+        api_key_env = "SONARR_4K_API_KEY"
+        concurrency = 2
+
+    API keys are read from the environment variable named by api_key_env (default:
+    <SERVICE>_API_KEY), so the file holds no secrets; api_key sets one inline. The
+    name defaults to the service name ("Sonarr"), which keeps the state recorded by
+    a single-instance setup valid.
+
+    Args:
+        path: Path to the TOML file
+        service_filter: Only return instances of this service (others are still validated,
+            but their API keys need not be set)
+
+    Returns:
+        Parsed and validated configuration
+
+    Raises:
+        ValueError: If the file is unreadable or invalid, or an API key is missing
+    """
+    import tomllib
+
+    try:
+        with path.open("rb") as file:
+            data = tomllib.load(file)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"Cannot read config {path}: {e}") from e
+
+    workers = data.get("workers")
+    if workers is not None and (type(workers) is not int or workers < 1):
+        raise ValueError("workers must be a positive integer")
+
+    option_types = {option.name: type(option.default) for option in fields(SyncOptions)}
+    instances = []
+    # Names become state keys and webhook URL segments, so their slugs must differ
+    names: list[str] = []
+    for index, entry in enumerate(data.get("instances", [])):
+        service = entry.get("service")
+        if service not in SERVICE_CLIENTS:
+            raise ValueError(f"instances[{index}]: service must be one of {', '.join(SERVICE_CLIENTS)}")
+        name = entry.get("name", service.capitalize())
+        names.append(instance_slug(name))
+        where = f"instances[{index}] ({name})"
+        unknown = set(entry) - {"service", "name", "url", "api_key", "api_key_env", *INSTANCE_OPTIONS}
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+
+        options = {key: entry[key] for key in INSTANCE_OPTIONS if key in entry}
+        for key, value in options.items():
+            expected = option_types[key]
+            if type(value) is not expected:
+                raise ValueError(f"{where}: {key} must be {TYPE_NAMES[expected]}")
+            if expected is int and value < 1:
+                raise ValueError(f"{where}: {key} must be at least 1")
+            if key in OPTION_CHOICES and value not in OPTION_CHOICES[key]:
+                raise ValueError(f"{where}: {key} must be one of {', '.join(OPTION_CHOICES[key])}")
+
+        if service_filter is not None and service != service_filter:
+            continue
+        api_key_env = entry.get("api_key_env", f"{service.upper()}_API_KEY")
+        api_key = entry.get("api_key") or os.environ.get(api_key_env)
+        if not api_key:
+            raise ValueError(f"{where}: environment variable {api_key_env} is not set")
+        _, default_url = SERVICE_CLIENTS[service]
+        instances.append(InstanceConfig(service, name, entry.get("url", default_url), api_key, options))
+
+    if not instances:
+        raise ValueError(f"{path} lists no {f'{service_filter} instances' if service_filter else '[[instances]]'}")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(
+            f"Instance names must be unique ignoring case and punctuation (set name = ...): {', '.join(duplicates)}"
+        )
+    return RunConfig(instances, workers)
+
+
+def create_instance_client(
+    instance: InstanceConfig,
+    dry_run: bool,
+    options: SyncOptions | None = None,
+    state: StateStore | None = None,
+    pool: threading.Semaphore | None = None,
+) -> ArrClient:
+    """
+    Build a client for an instance from the config file.
+
+    Args:
+        instance: Instance configuration
+        dry_run: If True, preview actions without executing
+        options: Run options; the instance's overrides are applied on top
+        state: Fingerprint store for incremental syncs
+        pool: Worker slots shared by all instances of the run
+
+    Returns:
+        Client for the instance
+    """
+    client_class, _ = SERVICE_CLIENTS[instance.service]
+    instance_options = replace(options or SyncOptions(), **instance.options)
+    return client_class(instance.url, instance.api_key, dry_run, instance_options, state, name=instance.name, pool=pool)
+
+
+def run_instances(
+    config: RunConfig,
+    dry_run: bool,
+    options: SyncOptions | None = None,
+    state: StateStore | None = None,
+) -> dict[str, InstanceResult]:
+    """
+    Sync every configured instance concurrently in one process.
+
+    Each instance processes up to its own concurrency; config.workers caps the work
+    units in flight across all instances, so a large instance can use the capacity a
+    finished one leaves behind without the total exceeding it. A failing instance
+    doesn't stop the others.
+
+    Args:
+        config: Instances and shared worker limit
+        dry_run: If True, preview actions without executing
+        options: Run options (instance settings override them)
+        state: Fingerprint store for incremental syncs
+
+    Returns:
+        Map of instance name to its outcome
+    """
+    pool = threading.BoundedSemaphore(config.workers) if config.workers else None
+
+    def run_one(instance: InstanceConfig) -> InstanceResult:
+        logger.info(f"Starting sync for {instance.name}")
+        started = time.monotonic()
+        client = create_instance_client(instance, dry_run, options, state, pool)
+        try:
+            succeeded = client.sync_all()
+        except Exception as e:
+            logger.error(f"Sync for {instance.name} aborted: {e}", exc_info=True)
+            succeeded = False
+        finally:
+            client.close()
+        return InstanceResult(succeeded, client.synced_count, client.failed_count, time.monotonic() - started)
+
+    with ThreadPoolExecutor(max_workers=len(config.instances), thread_name_prefix="instance") as executor:
+        futures = {instance.name: executor.submit(run_one, instance) for instance in config.instances}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def run_sonarr(dry_run: bool, options: SyncOptions | None = None, state: StateStore | None = None) -> bool:
     """
     Run sync operation for Sonarr.
 
     Args:
         dry_run: If True, preview actions without executing
+        options: Concurrency and batching options
+        state: Fingerprint store for incremental syncs
 
     Returns:
         True if sync completed successfully, False otherwise
     """
-    # Default to cluster internal service URL if not specified
-    url = os.environ.get("SONARR_URL", "http://sonarr.sonarr.svc.cluster.local")
-    api_key = get_env_or_fail("SONARR_API_KEY")
-    client = SonarrClient(url, api_key, dry_run)
-    return client.sync_all()
+    client = create_client("sonarr", dry_run, options, state)
+    try:
+        return client.sync_all()
+    finally:
+        client.close()
 
 
-def run_radarr(dry_run: bool) -> bool:
+def run_radarr(dry_run: bool, options: SyncOptions | None = None, state: StateStore | None = None) -> bool:
     """
     Run sync operation for Radarr.
 
     Args:
         dry_run: If True, preview actions without executing
+        options: Concurrency and batching options
+        state: Fingerprint store for incremental syncs
 
     Returns:
         True if sync completed successfully, False otherwise
     """
-    # Default to cluster internal service URL if not specified
-    url = os.environ.get("RADARR_URL", "http://radarr.radarr.svc.cluster.local")
-    api_key = get_env_or_fail("RADARR_API_KEY")
-    client = RadarrClient(url, api_key, dry_run)
-    return client.sync_all()
+    client = create_client("radarr", dry_run, options, state)
+    try:
+        return client.sync_all()
+    finally:
+        client.close()
 
 
-def run_lidarr(dry_run: bool) -> bool:
+def run_lidarr(dry_run: bool, options: SyncOptions | None = None, state: StateStore | None = None) -> bool:
     """
     Run sync operation for Lidarr.
 
     Args:
         dry_run: If True, preview actions without executing
+        options: Concurrency and batching options
+        state: Fingerprint store for incremental syncs
 
     Returns:
         True if sync completed successfully, False otherwise
     """
-    # Default to cluster internal service URL if not specified
-    url = os.environ.get("LIDARR_URL", "http://lidarr.lidarr.svc.cluster.local")
-    api_key = get_env_or_fail("LIDARR_API_KEY")
-    client = LidarrClient(url, api_key, dry_run)
-    return client.sync_all()
+    client = create_client("lidarr", dry_run, options, state)
+    try:
+        return client.sync_all()
+    finally:
+        client.close()
+
+
+def run_all(
+    runners: dict[str, Callable[..., bool]],
+    dry_run: bool,
+    options: SyncOptions | None = None,
+    state: StateStore | None = None,
+) -> dict[str, bool]:
+    """
+    Sync several services concurrently.
+
+    The services are independent backends, so a run takes as long as the slowest
+    one instead of the sum of all. A failing service (including missing
+    configuration or an unexpected error) doesn't stop the others.
+
+    Args:
+        runners: Map of service name to runner function (e.g., run_sonarr)
+        dry_run: If True, preview actions without executing
+        options: Concurrency and batching options (applied per service)
+        state: Fingerprint store for incremental syncs
+
+    Returns:
+        Map of service name to whether its sync succeeded
+    """
+
+    def run_one(name: str, runner: Callable[..., bool]) -> bool:
+        logger.info(f"Starting sync for {name}")
+        try:
+            return runner(dry_run, options, state)
+        except SystemExit:
+            # get_env_or_fail() already logged the missing variable
+            return False
+        except Exception as e:
+            logger.error(f"Sync for {name} aborted: {e}", exc_info=True)
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(runners), thread_name_prefix="service") as executor:
+        futures = {name: executor.submit(run_one, name, runner) for name, runner in runners.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def run_shards(shard_count: int) -> int:
+    """
+    Run every shard as a child process and combine their results.
+
+    Used when --shard-count is given without a shard index (outside an Indexed
+    Job): each child gets the same arguments plus --shard-index.
+
+    Args:
+        shard_count: Number of shards
+
+    Returns:
+        0 if every shard succeeded, 1 otherwise
+    """
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__), *sys.argv[1:]]
+    processes = [subprocess.Popen([*command, "--shard-index", str(shard_index)]) for shard_index in range(shard_count)]
+    results = [process.wait() == 0 for process in processes]
+    for shard_index, succeeded in enumerate(results):
+        logger.info(f"Summary: shard {shard_index} of {shard_count} {'succeeded' if succeeded else 'FAILED'}")
+    if not all(results):
+        logger.error(f"{results.count(False)} of {shard_count} shards failed")
+        return 1
+    return 0
+
+
+def run_watch(
+    dry_run: bool,
+    options: SyncOptions,
+    mode: str,
+    scan_interval: float,
+    debounce_seconds: float,
+    path_map: dict[str, str],
+    watch_paths: list[str],
+    webhook_port: int = 0,
+    webhook_token: str | None = None,
+    config: RunConfig | None = None,
+) -> int:
+    """
+    Watch the media volumes and sync items whose files change, until terminated.
+
+    Every instance of the config file, or without one every service with an API key
+    configured, is watched. With a webhook port, tdarr and *arr Connect webhooks
+    queue items as well (see webhook.py).
+
+    Args:
+        dry_run: If True, log rename plans instead of submitting commands
+        options: Concurrency and batching options (applied per service)
+        mode: Change detection, "scan" (mtime scans) or "inotify"
+        scan_interval: Seconds between scans in scan mode
+        debounce_seconds: Quiet period before a changed item is synced
+        path_map: Map of *arr path prefixes to local mount prefixes
+        watch_paths: Directories to watch (default: library roots derived from item paths)
+        webhook_port: Port for the webhook receiver (0: disabled)
+        webhook_token: Shared secret webhooks must present (None: no authentication)
+        config: Instances to watch (None: one per service with an API key set)
+
+    Returns:
+        0 after a clean shutdown, 1 if nothing could be watched
+    """
+    # Watch mode only; keeps the file watcher and HTTP server out of a sync's startup
+    from watch import WatchDaemon, create_change_source
+    from webhook import WebhookServer
+
+    clients: dict[str, ArrClient] = {}
+    if config is not None:
+        pool = threading.BoundedSemaphore(config.workers) if config.workers else None
+        for instance in config.instances:
+            clients[instance.name] = create_instance_client(instance, dry_run, options, pool=pool)
+    else:
+        for service in SERVICE_CLIENTS:
+            if os.environ.get(f"{service.upper()}_API_KEY"):
+                client = create_client(service, dry_run, options)
+                clients[client.config.name] = client
+    if not clients:
+        logger.error("No service API keys set (SONARR_API_KEY, RADARR_API_KEY, LIDARR_API_KEY)")
+        return 1
+
+    webhooks = None
+    try:
+        daemon = WatchDaemon(clients, debounce_seconds, path_map)
+        source = None
+        if mode != "none":
+            roots = watch_paths or daemon.roots()
+            if not roots:
+                logger.error("No library folders found locally; mount the media volumes or set --path-map/--watch-path")
+                return 1
+            logger.info(f"Watching {', '.join(roots)} ({mode})")
+            source = create_change_source(mode, roots, scan_interval)
+        elif not webhook_port:
+            logger.error("--watch-mode none needs --webhook-port, otherwise nothing is watched")
+            return 1
+        if webhook_port:
+            if not webhook_token:
+                logger.warning("ARRSYNC_WEBHOOK_TOKEN is not set, webhooks are accepted without authentication")
+            services = {instance_slug(name): name for name in clients}
+            webhooks = WebhookServer(("", webhook_port), daemon, services, webhook_token)
+            webhooks.start()
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+        try:
+            daemon.run(source)
+        except KeyboardInterrupt:
+            logger.info("Shutting down...")
+    finally:
+        if webhooks is not None:
+            webhooks.stop()
+        for client in clients.values():
+            client.close()
+    return 0
 
 
 def main() -> int:
@@ -590,8 +2373,19 @@ Examples:
     arrsync sonarr           Sync all Sonarr series
     arrsync radarr           Sync all Radarr movies
     arrsync lidarr           Sync all Lidarr artists
-    arrsync all              Sync all services
-    arrsync all --dry-run    Preview what would be synced
+    arrsync all              Sync all services concurrently
+    arrsync all --dry-run    Show the rename plan without changing anything
+    arrsync sonarr -c 8      Sync Sonarr with up to 8 commands in flight
+    arrsync sonarr -c 8 --adaptive  Let the server's command queue set the concurrency (max 8)
+    arrsync radarr -b 50     Sync Radarr with 50 movies per command
+    arrsync sonarr --pipeline  Refresh the next series while the previous one is renamed
+    arrsync all --full       Sync every item, ignoring stored fingerprints
+    arrsync all --config arrsync.toml  Sync every instance listed in the config file
+    arrsync all --resume     Continue an interrupted run from its checkpoint
+    arrsync all --drift-only  Only sync items whose file names still carry an old codec
+    arrsync all --shard-count 3  Split the library across 3 parallel processes
+    arrsync watch            Sync items as soon as their files change
+    arrsync watch --webhook-port 8080  Also sync items reported by tdarr/*arr webhooks
 
 Environment Variables:
     SONARR_URL       Sonarr base URL (default: http://sonarr.example.com)
@@ -600,17 +2394,174 @@ Environment Variables:
     RADARR_API_KEY   Radarr API key (required for radarr/all)
     LIDARR_URL       Lidarr base URL (default: http://lidarr.example.com)
     LIDARR_API_KEY   Lidarr API key (required for lidarr/all)
+    ARRSYNC_CONFIG       Default for --config (unset: instances from *_URL/*_API_KEY)
+    ARRSYNC_CONCURRENCY  Default for --concurrency (default: 1)
+    ARRSYNC_ADAPTIVE     Set to "true" to default to --adaptive
+    ARRSYNC_PIPELINE     Set to "true" to default to --pipeline
+    ARRSYNC_BATCH_SIZE   Default for --batch-size (default: 1)
+    ARRSYNC_STATE_DIR    Default for --state-dir (unset: no incremental sync)
+    ARRSYNC_COMPLETION   Default for --completion (default: poll)
+    ARRSYNC_DRIFT_ONLY   Set to "true" to default to --drift-only
+    ARRSYNC_RESUME       Set to "true" to default to --resume
+    ARRSYNC_CHECKPOINT_TTL_HOURS  Default for --checkpoint-ttl (default: 12)
+    ARRSYNC_ORDER        Default for --order (default: recent)
+    ARRSYNC_SHARD_COUNT  Default for --shard-count (default: 1)
+    JOB_COMPLETION_INDEX  Default for --shard-index (set by Kubernetes Indexed Jobs)
+    ARRSYNC_WATCH_MODE   Default for --watch-mode (default: scan)
+    ARRSYNC_SCAN_INTERVAL  Default for --scan-interval (default: 300)
+    ARRSYNC_DEBOUNCE     Default for --debounce (default: 60)
+    ARRSYNC_PATH_MAP     Comma-separated --path-map entries
+    ARRSYNC_WATCH_PATHS  Comma-separated --watch-path entries
+    ARRSYNC_WEBHOOK_PORT  Default for --webhook-port (default: 0, disabled)
+    ARRSYNC_WEBHOOK_TOKEN  Shared secret webhooks must send (?token= or X-Arrsync-Token)
+    ARRSYNC_METRICS_TEXTFILE  Default for --metrics-textfile (unset: not written)
+    ARRSYNC_PUSHGATEWAY_URL   Default for --pushgateway (unset: not pushed)
         """,
     )
     parser.add_argument(
         "service",
-        choices=["sonarr", "radarr", "lidarr", "all"],
-        help="Service to sync (or 'all' for all services)",
+        choices=["sonarr", "radarr", "lidarr", "all", "watch"],
+        help="Service to sync ('all' for all services, 'watch' to sync changed items continuously)",
     )
     parser.add_argument(
         "--dry-run",
         action="store_true",
-        help="Preview actions without making changes",
+        help="Log the rename plan for each service without submitting commands",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=int(os.environ.get("ARRSYNC_CONCURRENCY", "1")),
+        help="Maximum items processed (and commands in flight) at once per service",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=os.environ.get("ARRSYNC_PIPELINE", "false").lower() == "true",
+        help="Refresh the next items while earlier ones are renamed (up to 2x --concurrency commands in flight)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=os.environ.get("ARRSYNC_ADAPTIVE", "false").lower() == "true",
+        help="Adjust concurrency to the server's command queue and latency, up to --concurrency",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=int(os.environ.get("ARRSYNC_BATCH_SIZE", "1")),
+        help="Items per refresh/rename command (Sonarr/Radarr only; failing batches are bisected)",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=os.environ.get("ARRSYNC_CONFIG"),
+        help="TOML file listing the *arr instances to sync (default: one instance per service from the environment)",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=os.environ.get("ARRSYNC_STATE_DIR"),
+        help="Directory for the state database; enables skipping items unchanged since their last sync",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Sync every item even if its files are unchanged (fingerprints are still recorded)",
+    )
+    parser.add_argument(
+        "--drift-only",
+        action="store_true",
+        default=os.environ.get("ARRSYNC_DRIFT_ONLY", "false").lower() == "true",
+        help="Only sync items with files named for a codec other than the one the service detected",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=os.environ.get("ARRSYNC_RESUME", "false").lower() == "true",
+        help="Skip items an interrupted run already completed (requires --state-dir)",
+    )
+    parser.add_argument(
+        "--checkpoint-ttl",
+        type=float,
+        default=float(os.environ.get("ARRSYNC_CHECKPOINT_TTL_HOURS", "12")),
+        help="Hours after which checkpoints are ignored by --resume (default: 12)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["recent", "library"],
+        default=os.environ.get("ARRSYNC_ORDER", "recent"),
+        help="Sync items with the most recently added files first, or in library order (default: recent)",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=int(os.environ.get("ARRSYNC_SHARD_COUNT", "1")),
+        help="Split each library into this many shards by a stable hash of the item ID (default: 1)",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=int(os.environ["JOB_COMPLETION_INDEX"]) if "JOB_COMPLETION_INDEX" in os.environ else None,
+        help="Shard to sync (default: JOB_COMPLETION_INDEX; if unset, all shards run as child processes)",
+    )
+    parser.add_argument(
+        "--completion",
+        choices=["poll", "signalr"],
+        default=os.environ.get("ARRSYNC_COMPLETION", "poll"),
+        help="Detect command completion by polling, or from the SignalR message stream (falls back to polling)",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=os.environ.get("ARRSYNC_METRICS_TEXTFILE"),
+        help="Write run metrics to this file in Prometheus text format (node-exporter textfile collector)",
+    )
+    parser.add_argument(
+        "--pushgateway",
+        default=os.environ.get("ARRSYNC_PUSHGATEWAY_URL"),
+        help="Push run metrics to this Prometheus Pushgateway URL (job=arrsync)",
+    )
+    watch_group = parser.add_argument_group("watch mode")
+    watch_group.add_argument(
+        "--watch-mode",
+        choices=["scan", "inotify", "none"],
+        default=os.environ.get("ARRSYNC_WATCH_MODE", "scan"),
+        help="Detect file changes by periodic mtime scans, inotify (local writers only), or not at all "
+        "(webhooks only; default: scan)",
+    )
+    watch_group.add_argument(
+        "--scan-interval",
+        type=float,
+        default=float(os.environ.get("ARRSYNC_SCAN_INTERVAL", "300")),
+        help="Seconds between mtime scans (default: 300)",
+    )
+    watch_group.add_argument(
+        "--debounce",
+        type=float,
+        default=float(os.environ.get("ARRSYNC_DEBOUNCE", "60")),
+        help="Seconds an item's files must be unchanged before it is synced (default: 60)",
+    )
+    watch_group.add_argument(
+        "--path-map",
+        action="append",
+        default=[entry for entry in os.environ.get("ARRSYNC_PATH_MAP", "").split(",") if entry],
+        metavar="ARR_PATH=LOCAL_PATH",
+        help="Where an *arr path prefix is mounted locally (repeatable)",
+    )
+    watch_group.add_argument(
+        "--watch-path",
+        action="append",
+        default=[entry for entry in os.environ.get("ARRSYNC_WATCH_PATHS", "").split(",") if entry],
+        help="Directory to watch (repeatable; default: library folders derived from item paths)",
+    )
+    watch_group.add_argument(
+        "--webhook-port",
+        type=int,
+        default=int(os.environ.get("ARRSYNC_WEBHOOK_PORT", "0")),
+        help="Accept tdarr and *arr Connect webhooks on this port (default: 0, disabled)",
     )
     parser.add_argument(
         "-v",
@@ -621,13 +2572,74 @@ Environment Variables:
 
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.resume and not args.state_dir:
+        parser.error("--resume requires --state-dir (or ARRSYNC_STATE_DIR)")
+    if args.shard_count < 1:
+        parser.error("--shard-count must be at least 1")
+    if args.shard_index is not None and not 0 <= args.shard_index < args.shard_count:
+        parser.error(f"--shard-index must be between 0 and {args.shard_count - 1}")
+    if args.service == "watch" and args.shard_count > 1:
+        parser.error("--shard-count applies to sync runs, not watch mode")
+    if any("=" not in entry for entry in args.path_map):
+        parser.error("--path-map entries must look like ARR_PATH=LOCAL_PATH")
+    config = None
+    if args.config:
+        try:
+            config = load_config(args.config, args.service if args.service in SERVICE_CLIENTS else None)
+        except ValueError as e:
+            parser.error(str(e))
+    options = SyncOptions(
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        full=args.full,
+        resume=args.resume,
+        checkpoint_ttl_hours=args.checkpoint_ttl,
+        order=args.order,
+        shard_index=args.shard_index or 0,
+        shard_count=args.shard_count,
+        completion=args.completion,
+        drift_only=args.drift_only,
+        adaptive=args.adaptive,
+        pipeline=args.pipeline,
+    )
     # Enable debug logging if requested
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.shard_count > 1:
+        if args.shard_index is None:
+            return run_shards(args.shard_count)
+        # Tell interleaved shard logs apart
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(
+                logging.Formatter(
+                    f"%(asctime)s [%(levelname)s] [shard {args.shard_index}] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+                )
+            )
+
     if args.dry_run:
         logger.info("Running in dry-run mode - no changes will be made")
 
+    if args.service == "watch":
+        # Watch mode syncs single items; state (fingerprints, checkpoints) belongs to the nightly run
+        path_map = dict(entry.split("=", 1) for entry in args.path_map)
+        return run_watch(
+            args.dry_run,
+            options,
+            args.watch_mode,
+            args.scan_interval,
+            args.debounce,
+            path_map,
+            args.watch_path,
+            args.webhook_port,
+            os.environ.get("ARRSYNC_WEBHOOK_TOKEN"),
+            config,
+        )
+
     # Map service names to their runner functions
     services = {
         "sonarr": run_sonarr,
@@ -635,19 +2647,53 @@ Environment Variables:
         "lidarr": run_lidarr,
     }
 
+    # Shards of one run export side by side (one textfile / Pushgateway group each)
+    grouping = {"shard": str(args.shard_index)} if args.shard_count > 1 else {}
+    metrics_textfile = args.metrics_textfile
+    if metrics_textfile is not None and grouping:
+        metrics_textfile = metrics_textfile.with_name(
+            f"{metrics_textfile.stem}-shard-{args.shard_index}{metrics_textfile.suffix}"
+        )
+
+    # Opened only here: the shard coordinator and watch mode never touch the state
+    state = StateStore(args.state_dir / "arrsync.db") if args.state_dir else None
+
     # Execute sync for requested service(s)
-    if args.service == "all":
-        # Process all services sequentially
-        # Fail fast if any service fails
-        for name, runner in services.items():
-            logger.info(f"Starting sync for {name}")
-            if not runner(args.dry_run):
-                logger.error(f"Sync failed for {name}")
+    try:
+        if config is not None:
+            # Every configured instance (of the requested service) concurrently, with one summary
+            instance_results = run_instances(config, args.dry_run, options, state)
+            for name, result in instance_results.items():
+                logger.info(
+                    f"Summary: {name} {'succeeded' if result.succeeded else 'FAILED'} "
+                    f"({result.synced} synced, {result.failed} failed, {result.seconds:.0f}s)"
+                )
+            logger.info(
+                f"Summary: {len(instance_results)} instances, "
+                f"{sum(result.synced for result in instance_results.values())} items synced, "
+                f"{sum(result.failed for result in instance_results.values())} failed"
+            )
+            failed = [name for name, result in instance_results.items() if not result.succeeded]
+            if failed:
+                logger.error(f"Sync failed for {', '.join(failed)}")
                 return 1
-    else:
-        # Process single service
-        if not services[args.service](args.dry_run):
-            return 1
+        elif args.service == "all":
+            # Process all services concurrently and report each result
+            results = run_all(services, args.dry_run, options, state)
+            for name, succeeded in results.items():
+                logger.info(f"Summary: {name} {'succeeded' if succeeded else 'FAILED'}")
+            failed = [name for name, succeeded in results.items() if not succeeded]
+            if failed:
+                logger.error(f"Sync failed for {', '.join(failed)}")
+                return 1
+        else:
+            # Process single service
+            if not services[args.service](args.dry_run, options, state):
+                return 1
+    finally:
+        if state is not None:
+            state.close()
+        metrics.export(metrics_textfile, args.pushgateway, grouping)
 
     logger.info("Sync completed successfully")
     return 0
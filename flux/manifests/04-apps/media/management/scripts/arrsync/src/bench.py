@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+bench - Offline throughput benchmark for arrSync.
+
+Runs arrsync.py against an in-process fakearr server for every combination of the
+given library sizes, command duration distributions and failure rates, and reports
+items/sec, requests per item (with a per-endpoint breakdown) and the peak RSS of the
+sync process:
+
+    python bench.py --items 500,5000 --command-seconds 0.05 --distribution exponential,lognormal
+    python bench.py --service lidarr --items 1000 --failure-rate 0,0.01 -- --concurrency 4 --adaptive
+
+Arguments after "--" are passed to arrsync.py, so options can be compared on the
+same scenarios. Each run is a fresh arrsync.py process, so RSS and startup cost are
+measured as in the CronJob.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from fakearr import DISTRIBUTIONS, FakeArr, FakeArrServer
+
+logger = logging.getLogger("bench")
+
+ARRSYNC = Path(__file__).parent / "arrsync.py"
+
+SERVICE_ENV = {"sonarr": "SONARR", "radarr": "RADARR", "lidarr": "LIDARR"}
+
+
+@dataclass
+class Scenario:
+    """
+    One simulated server configuration.
+
+    Attributes:
+        items: Library size
+        distribution: Command duration distribution (see fakearr.DISTRIBUTIONS)
+        failure_rate: Probability that a command fails
+    """
+
+    items: int
+    distribution: str
+    failure_rate: float
+
+
+@dataclass
+class Result:
+    """
+    Measurements of one arrsync.py run.
+
+    Attributes:
+        scenario: Simulated server configuration
+        seconds: Wall time of the arrsync.py process
+        items_per_second: Library items divided by wall time
+        requests: Requests served, keyed by method and resource (e.g., "GET rename")
+        peak_rss_mib: Peak resident set size of the arrsync.py process
+        exit_code: Exit code of arrsync.py (1 is expected with failure rates)
+    """
+
+    scenario: Scenario
+    seconds: float
+    items_per_second: float
+    requests: dict[str, int]
+    peak_rss_mib: float
+    exit_code: int
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+
+def run_scenario(scenario: Scenario, args: argparse.Namespace, arrsync_args: list[str]) -> Result:
+    """
+    Serve a fresh fake library and time one arrsync.py run against it.
+
+    Args:
+        scenario: Library size, duration distribution and failure rate
+        args: Benchmark options (service, command duration, workers, ...)
+        arrsync_args: Extra arguments for arrsync.py
+
+    Returns:
+        Measurements of the run
+    """
+    fake = FakeArr(
+        scenario.items,
+        args.command_seconds,
+        seed=args.seed,
+        workers=args.workers,
+        distribution=scenario.distribution,
+        failure_rate=scenario.failure_rate,
+        http_failure_rate=args.http_failure_rate,
+        http_latency=args.http_latency,
+        rename_fraction=args.rename_fraction,
+    )
+    server = FakeArrServer(("127.0.0.1", 0), fake)
+    threading.Thread(target=server.serve_forever, name="fakearr", daemon=True).start()
+
+    prefix = SERVICE_ENV[args.service]
+    env = {key: value for key, value in os.environ.items() if not key.startswith("ARRSYNC_")}
+    env[f"{prefix}_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    env[f"{prefix}_API_KEY"] = "bench"
+
+    output = None if args.verbose else subprocess.DEVNULL
+    try:
+        started = time.monotonic()
+        process = subprocess.Popen(
+            [sys.executable, str(ARRSYNC), args.service, *arrsync_args], env=env, stdout=output, stderr=output
+        )
+        # wait4 reports the resource usage of this child alone (RUSAGE_CHILDREN is a running maximum)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        seconds = time.monotonic() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak_rss = usage.ru_maxrss / 1024 if sys.platform != "darwin" else usage.ru_maxrss / 1024 / 1024
+    return Result(
+        scenario=scenario,
+        seconds=seconds,
+        items_per_second=scenario.items / seconds if seconds > 0 else 0.0,
+        requests=dict(fake.request_counts.most_common()),
+        peak_rss_mib=peak_rss,
+        exit_code=process.returncode,
+    )
+
+
+def print_results(results: list[Result]) -> None:
+    """Print a table of results followed by the request breakdown of each run."""
+    header = (
+        f"{'items':>7} {'distribution':>12} {'failures':>8} {'seconds':>8} {'items/s':>8} "
+        f"{'requests':>8} {'req/item':>8} {'RSS MiB':>8} {'exit':>4}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        scenario = result.scenario
+        print(
+            f"{scenario.items:>7} {scenario.distribution:>12} {scenario.failure_rate:>8.3f} "
+            f"{result.seconds:>8.2f} {result.items_per_second:>8.1f} {result.total_requests:>8} "
+            f"{result.total_requests / scenario.items:>8.2f} {result.peak_rss_mib:>8.1f} {result.exit_code:>4}"
+        )
+    print()
+    for result in results:
+        scenario = result.scenario
+        breakdown = ", ".join(f"{endpoint}={count}" for endpoint, count in result.requests.items())
+        print(f"{scenario.items} items, {scenario.distribution}, {scenario.failure_rate:.3f}: {breakdown}")
+
+
+def _csv(cast: Callable[[str], Any]) -> Callable[[str], list[Any]]:
+    """Argument type for comma-separated lists."""
+    return lambda value: [cast(entry) for entry in value.split(",") if entry]
+
+
+def main() -> int:
+    """Run the benchmark grid and report the results."""
+    argv = sys.argv[1:]
+    arrsync_args: list[str] = []
+    if "--" in argv:
+        arrsync_args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark arrsync.py against a simulated *arr server",
+        epilog='Arguments after "--" are passed to arrsync.py (e.g., -- --concurrency 4 --batch-size 25).',
+    )
+    parser.add_argument("--service", choices=sorted(SERVICE_ENV), default="sonarr", help="Service to simulate")
+    parser.add_argument("--items", type=_csv(int), default=[1000], help="Library sizes (comma-separated)")
+    parser.add_argument(
+        "--distribution",
+        type=_csv(str),
+        default=["exponential"],
+        help=f"Command duration distributions (comma-separated: {', '.join(DISTRIBUTIONS)})",
+    )
+    parser.add_argument(
+        "--failure-rate", type=_csv(float), default=[0.0], help="Command failure probabilities (comma-separated)"
+    )
+    parser.add_argument("--command-seconds", type=float, default=0.05, help="Mean command duration (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=3, help="Commands the server runs at once (default: 3)")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Seconds added to every API response")
+    parser.add_argument("--http-failure-rate", type=float, default=0.0, help="Probability of an HTTP 500")
+    parser.add_argument(
+        "--rename-fraction", type=float, default=0.1, help="Fraction of items needing a rename (default: 0.1)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the simulated server")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show arrsync.py output")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.distribution) - set(DISTRIBUTIONS)
+    if unknown:
+        parser.error(f"unknown distribution(s): {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    results = []
+    for items, distribution, failure_rate in itertools.product(args.items, args.distribution, args.failure_rate):
+        scenario = Scenario(items, distribution, failure_rate)
+        logger.info(f"Running {scenario}")
+        results.append(run_scenario(scenario, args, arrsync_args))
+
+    print_results(results)
+    if args.json:
+        report = [{**asdict(result), "total_requests": result.total_requests} for result in results]
+        args.json.write_text(json.dumps({"arrsync_args": arrsync_args, "results": report}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+bundle - Prebuilt dependency bundle for arrSync pods.
+
+Replaces the `pip install` every pod used to run in its init container: the
+dependencies are installed once into a cache volume, in a directory keyed by
+requirements.txt and the Python build, and every later pod reuses it until one of
+them changes (a requirements bump or a new Python image). pip compiles the bytecode
+at install time, so the modules are not compiled on each start either.
+
+    python bundle.py install --cache /state/bundle     # init container
+    PYTHONPATH=/state/bundle/current python /scripts/arrsync.py all
+
+    python bundle.py profile                           # where startup time goes
+
+`profile` reports the remaining startup cost: interpreter start and the
+`-X importtime` breakdown of importing arrsync and everything it pulls in.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger("bundle")
+
+SCRIPTS = Path(__file__).parent
+
+# Written last, so a bundle without it is a half-finished install
+COMPLETE_MARKER = ".bundle-complete"
+
+# Symlink to the bundle pods put on PYTHONPATH
+CURRENT_LINK = "current"
+
+# Staging directories of pods killed mid-install are removed after this long
+STALE_STAGING_SECONDS = 3600
+
+BUNDLE_NAME = re.compile(r"^[0-9a-f]{16}$")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+# ---------------------------------------------------------------------------
+# Install
+# ---------------------------------------------------------------------------
+
+
+def bundle_key(requirements: Path) -> str:
+    """
+    Identify the bundle for a requirements file and this interpreter.
+
+    Bytecode and compiled extensions only work on the Python build and
+    architecture that produced them, so both are part of the key.
+
+    Args:
+        requirements: requirements.txt the bundle is installed from
+
+    Returns:
+        16 hex digits
+    """
+    digest = hashlib.sha256(requirements.read_bytes())
+    digest.update(sys.version.encode())
+    digest.update(platform.machine().encode())
+    return digest.hexdigest()[:16]
+
+
+def build(bundle: Path, requirements: Path) -> None:
+    """
+    Install the requirements into a bundle directory.
+
+    Installs into a staging directory and renames it into place, so concurrent
+    pods (the shards of one Job) never see a partial bundle; if another pod wins
+    the race, its bundle is kept and ours discarded.
+
+    Args:
+        bundle: Final bundle directory
+        requirements: requirements.txt to install
+
+    Raises:
+        subprocess.CalledProcessError: If pip fails
+    """
+    staging = bundle.with_name(f".{bundle.name}.{socket.gethostname()}.{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    started = time.monotonic()
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--no-cache-dir",
+            "--disable-pip-version-check",
+            "--quiet",
+            f"--target={staging}",
+            "-r",
+            str(requirements),
+        ],
+        check=True,
+    )
+    (staging / COMPLETE_MARKER).touch()
+    try:
+        staging.rename(bundle)
+    except OSError:
+        if not (bundle / COMPLETE_MARKER).exists():
+            raise
+        shutil.rmtree(staging, ignore_errors=True)
+        logger.info(f"Bundle {bundle.name} was built concurrently by another pod")
+        return
+    logger.info(f"Built bundle {bundle.name} in {time.monotonic() - started:.1f}s")
+
+
+def link_current(cache: Path, key: str) -> None:
+    """Point the current link at a bundle, atomically."""
+    temporary = cache / f".{CURRENT_LINK}.{socket.gethostname()}.{os.getpid()}"
+    temporary.unlink(missing_ok=True)
+    temporary.symlink_to(key)
+    temporary.replace(cache / CURRENT_LINK)
+
+
+def prune(cache: Path, key: str) -> None:
+    """
+    Remove bundles other than the current one, and stale staging directories.
+
+    Args:
+        cache: Cache directory
+        key: Bundle to keep
+    """
+    now = time.time()
+    for entry in cache.iterdir():
+        if entry.name in (key, CURRENT_LINK) or entry.is_symlink():
+            continue
+        if BUNDLE_NAME.match(entry.name):
+            logger.info(f"Removing old bundle {entry.name}")
+        elif entry.name.startswith(".") and now - entry.stat().st_mtime > STALE_STAGING_SECONDS:
+            logger.info(f"Removing stale staging directory {entry.name}")
+        else:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def install(cache: Path, requirements: Path) -> Path:
+    """
+    Make the bundle for a requirements file current, building it if needed.
+
+    Args:
+        cache: Cache directory (a persistent volume)
+        requirements: requirements.txt to install
+
+    Returns:
+        Bundle directory
+    """
+    cache.mkdir(parents=True, exist_ok=True)
+    key = bundle_key(requirements)
+    bundle = cache / key
+    if (bundle / COMPLETE_MARKER).exists():
+        logger.info(f"Reusing bundle {key}")
+    else:
+        logger.info(f"Building bundle {key} from {requirements}")
+        build(bundle, requirements)
+    link_current(cache, key)
+    prune(cache, key)
+    return bundle
+
+
+# ---------------------------------------------------------------------------
+# Import-time profile
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ImportTime:
+    """
+    One module from `python -X importtime`.
+
+    Attributes:
+        module: Module name
+        self_us: Microseconds spent in the module itself
+        cumulative_us: Microseconds including the modules it imported
+        depth: Nesting level (0 for modules imported by arrsync or the interpreter)
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """
+    Parse the stderr of `python -X importtime`.
+
+    Args:
+        output: Captured stderr
+
+    Returns:
+        Imported modules in the order they finished loading
+    """
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(ImportTime(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure(code: str, env: dict[str, str]) -> tuple[float, list[ImportTime]]:
+    """
+    Run code in a fresh interpreter with -X importtime.
+
+    Args:
+        code: Code for python -c
+        env: Environment of the interpreter
+
+    Returns:
+        Wall time in seconds and the parsed import times
+    """
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return time.monotonic() - started, parse_importtime(result.stderr)
+
+
+def profile(runs: int, top: int) -> None:
+    """
+    Print where arrsync's startup time goes, from the fastest of several runs.
+
+    Args:
+        runs: Interpreter starts per measurement; the fastest counts (warm page cache)
+        top: Number of modules to list
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SCRIPTS), env.get("PYTHONPATH")]))
+
+    baseline = min(measure("pass", env)[0] for _ in range(runs))
+    seconds, imports = min((measure("import arrsync", env) for _ in range(runs)), key=lambda run: run[0])
+    interpreter = {entry.module for entry in measure("pass", env)[1]}
+    loaded = [entry for entry in imports if entry.module not in interpreter]
+
+    print(f"Interpreter start:       {baseline * 1000:7.1f} ms")
+    print(f"Start + import arrsync:  {seconds * 1000:7.1f} ms (fastest of {runs})")
+    print(f"Modules arrsync imports: {len(loaded):7d}")
+    print()
+    print("Imported by arrsync (cumulative):")
+    direct = [entry for entry in loaded if entry.depth == 1]
+    for entry in sorted(direct, key=lambda entry: entry.cumulative_us, reverse=True)[:top]:
+        print(f"  {entry.cumulative_us / 1000:7.1f} ms  {entry.module}")
+    print()
+    print("Slowest modules (self):")
+    for entry in sorted(loaded, key=lambda entry: entry.self_us, reverse=True)[:top]:
+        print(f"  {entry.self_us / 1000:7.1f} ms  {entry.module}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> int:
+    """Install the bundle or profile startup."""
+    parser = argparse.ArgumentParser(description="Prebuilt dependency bundle for arrSync pods")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    install_parser = subparsers.add_parser("install", help="Build or reuse the bundle and make it current")
+    install_parser.add_argument("--cache", type=Path, required=True, help="Cache directory (a persistent volume)")
+    install_parser.add_argument(
+        "--requirements",
+        type=Path,
+        default=SCRIPTS / "requirements.txt",
+        help="Requirements to install (default: requirements.txt next to this script)",
+    )
+
+    profile_parser = subparsers.add_parser("profile", help="Show where arrsync's startup time goes")
+    profile_parser.add_argument("--runs", type=int, default=5, help="Interpreter starts per measurement (default: 5)")
+    profile_parser.add_argument("--top", type=int, default=15, help="Modules to list (default: 15)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "install":
+        try:
+            install(args.cache, args.requirements)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"Could not install the bundle: {e}")
+            return 1
+        return 0
+
+    profile(args.runs, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
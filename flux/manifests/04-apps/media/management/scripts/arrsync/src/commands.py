@@ -0,0 +1,442 @@
+"""
+Command completion tracking for arrSync.
+
+*arr commands run asynchronously on the server. Instead of every worker polling
+GET /command/{id} on a fixed interval, a CommandTracker polls the GET /command list
+once per tick for all outstanding commands and resolves a Future per command.
+
+An AdaptiveLimiter uses the same command queue to decide how many work units may
+be in flight, so arrSync doesn't crowd out the server's own tasks (RSS sync,
+imports) that share its command executor.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Commands finished (or abandoned) by the server
+TERMINAL_STATES = frozenset({"completed", "failed", "aborted", "cancelled", "orphaned"})
+
+# Typical per-item durations in seconds, used until real durations have been observed.
+# Renames are mostly no-op database work; refreshes hit the metadata provider and disk.
+DEFAULT_COMMAND_SECONDS = {
+    "RefreshSeries": 10.0,
+    "RenameSeries": 2.0,
+    "RefreshMovie": 5.0,
+    "RenameMovie": 1.0,
+    "RefreshArtist": 30.0,
+    "RenameFiles": 2.0,
+}
+FALLBACK_COMMAND_SECONDS = 5.0
+
+# Many commands complete within a second; check those almost immediately
+FIRST_CHECK_SECONDS = 0.5
+MIN_INTERVAL_SECONDS = 0.25
+MAX_INTERVAL_SECONDS = 10.0
+
+# Weight of the newest observation in the moving average of command durations
+DURATION_SMOOTHING = 0.3
+
+# With pushed updates, polling only guards against missed events
+PUSH_SAFETY_INTERVAL_SECONDS = 30.0
+
+# Terminal updates that arrive before track() is called (push can beat the POST response)
+MAX_EARLY_UPDATES = 1000
+
+# Latency signal for adaptive concurrency: a fast and a slow moving average of per-item
+# command durations; their ratio rises when commands start taking longer than usual
+LATENCY_FAST_SMOOTHING = 0.3
+LATENCY_SLOW_SMOOTHING = 0.05
+
+# AIMD tuning: sample the server at most this often, back off when more commands wait for
+# a server worker than this or recent commands take this many times longer than usual
+LIMIT_SAMPLE_SECONDS = 5.0
+MAX_QUEUED_COMMANDS = 2
+LATENCY_TOLERANCE = 2.0
+DECREASE_FACTOR = 0.5
+
+
+def command_weight(command: dict[str, Any]) -> int:
+    """
+    Number of items a command operates on.
+
+    Batched commands take roughly proportionally longer, so expected durations are
+    tracked per item and scaled by this weight.
+
+    Args:
+        command: Command object as returned by the API (with "body") or as submitted
+
+    Returns:
+        Item count, at least 1
+    """
+    body = command.get("body", command)
+    for key in ("seriesIds", "movieIds", "artistIds", "files"):
+        if isinstance(body.get(key), list) and body[key]:
+            return len(body[key])
+    return 1
+
+
+@dataclass
+class _PendingCommand:
+    """Bookkeeping for a command that has not reached a terminal state."""
+
+    command_id: int
+    name: str
+    weight: int
+    submitted_at: float
+    next_check: float
+    overdue_checks: int = 0
+    future: Future = field(default_factory=Future)
+
+
+class CommandTracker:
+    """
+    Resolve *arr command completion for many in-flight commands at once.
+
+    A background thread polls GET /command (one request for all outstanding
+    commands) and schedules the next tick adaptively: a fast first check shortly
+    after submission, then around the expected completion time based on a moving
+    average of observed durations per command type, backing off exponentially for
+    commands that run longer than expected. Commands that have dropped out of the
+    list are looked up individually via GET /command/{id}.
+
+    Other completion sources (e.g., pushed status events) can feed update(); while
+    such a source is active (set_push), polling drops to a slow safety interval.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[str], Any]):
+        """
+        Initialize the tracker.
+
+        Args:
+            name: Service name for log messages
+            fetch: Function performing a GET against the service API (ArrClient._get)
+        """
+        self.name = name
+        self._fetch = fetch
+        self._pending: dict[int, _PendingCommand] = {}
+        self._seconds_per_item = dict(DEFAULT_COMMAND_SECONDS)
+        self._condition = threading.Condition()
+        self._poller: threading.Thread | None = None
+        self._push_active = False
+        self._early_updates: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._latency_fast: dict[str, float] = {}
+        self._latency_slow: dict[str, float] = {}
+        self._latency_ratios: dict[str, float] = {}
+
+    def set_push(self, active: bool) -> None:
+        """
+        Switch between push mode (slow safety polls) and normal polling.
+
+        Leaving push mode reschedules every pending command for an immediate check,
+        since updates may have been lost with the connection.
+
+        Args:
+            active: True while a push source is delivering command updates
+        """
+        with self._condition:
+            if active == self._push_active:
+                return
+            self._push_active = active
+            delay = PUSH_SAFETY_INTERVAL_SECONDS if active else MIN_INTERVAL_SECONDS
+            for pending in self._pending.values():
+                pending.next_check = time.monotonic() + delay
+            self._condition.notify()
+
+    def track(self, command: dict[str, Any]) -> Future:
+        """
+        Start tracking a submitted command.
+
+        Args:
+            command: Command object returned by POST /command
+
+        Returns:
+            Future resolved with the final command object once it reaches a terminal state
+        """
+        now = time.monotonic()
+        pending = _PendingCommand(
+            command_id=command["id"],
+            name=command.get("name", ""),
+            weight=command_weight(command),
+            submitted_at=now,
+            next_check=now + FIRST_CHECK_SECONDS,
+        )
+        with self._condition:
+            early_update = self._early_updates.pop(pending.command_id, None)
+            if early_update is not None:
+                pending.future.set_result(early_update)
+                return pending.future
+            if self._push_active:
+                pending.next_check = now + PUSH_SAFETY_INTERVAL_SECONDS
+            self._pending[pending.command_id] = pending
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._run, name=f"{self.name}-commands", daemon=True)
+                self._poller.start()
+            self._condition.notify()
+        return pending.future
+
+    def wait(self, command: dict[str, Any], timeout: float) -> dict[str, Any] | None:
+        """
+        Track a command and block until it finishes.
+
+        Args:
+            command: Command object returned by POST /command
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            Final command object, or None if the command did not finish in time
+        """
+        future = self.track(command)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            with self._condition:
+                self._pending.pop(command["id"], None)
+            return None
+
+    def update(self, command: dict[str, Any]) -> None:
+        """
+        Apply a command status update, resolving the command if it has finished.
+
+        Args:
+            command: Command object with at least "id" and "status"
+        """
+        if command.get("status") not in TERMINAL_STATES:
+            return
+        with self._condition:
+            pending = self._pending.pop(command.get("id"), None)
+            if pending is None:
+                if self._push_active:
+                    self._early_updates[command.get("id")] = command
+                    while len(self._early_updates) > MAX_EARLY_UPDATES:
+                        self._early_updates.popitem(last=False)
+                return
+            elapsed = time.monotonic() - pending.submitted_at
+            average = self._seconds_per_item.get(pending.name, FALLBACK_COMMAND_SECONDS)
+            observed = elapsed / pending.weight
+            self._seconds_per_item[pending.name] = average + DURATION_SMOOTHING * (observed - average)
+            self._observe_latency(pending.name, observed)
+        pending.future.set_result(command)
+
+    @property
+    def latency_ratio(self) -> float:
+        """
+        Recent over usual command duration for the command type that slowed down the most.
+
+        A work unit runs several command types, so a slowdown of any of them counts
+        (1.0 until commands have finished).
+        """
+        with self._condition:
+            return max(self._latency_ratios.values(), default=1.0)
+
+    def _observe_latency(self, name: str, seconds_per_item: float) -> None:
+        """
+        Update a command type's latency ratio from a finished command. Must be called with the condition held.
+
+        Durations are compared per command type, since refreshes and renames differ
+        by an order of magnitude. Both averages start at the first observation.
+        """
+        fast = self._latency_fast.get(name, seconds_per_item)
+        slow = self._latency_slow.get(name, seconds_per_item)
+        self._latency_fast[name] = fast + LATENCY_FAST_SMOOTHING * (seconds_per_item - fast)
+        self._latency_slow[name] = slow + LATENCY_SLOW_SMOOTHING * (seconds_per_item - slow)
+        if self._latency_slow[name] > 0:
+            self._latency_ratios[name] = self._latency_fast[name] / self._latency_slow[name]
+
+    def server_queue(self) -> tuple[int, int]:
+        """
+        Fetch the server's command queue, resolving any tracked commands it shows finished.
+
+        Returns:
+            Number of (queued, started) commands on the server, from all sources
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        commands = self._fetch("command")
+        with self._condition:
+            tracked = [command for command in commands if command.get("id") in self._pending]
+        for command in tracked:
+            self.update(command)
+        queued = sum(1 for command in commands if command.get("status") == "queued")
+        started = sum(1 for command in commands if command.get("status") == "started")
+        return queued, started
+
+    def expected_seconds(self, name: str, weight: int = 1) -> float:
+        """
+        Expected duration of a command based on observed history.
+
+        Args:
+            name: Command name (e.g., "RefreshSeries")
+            weight: Number of items the command operates on
+
+        Returns:
+            Expected duration in seconds
+        """
+        with self._condition:
+            return self._seconds_per_item.get(name, FALLBACK_COMMAND_SECONDS) * weight
+
+    def _run(self) -> None:
+        """Poll loop; exits when nothing is pending and is restarted by track()."""
+        while True:
+            with self._condition:
+                if not self._pending:
+                    self._poller = None
+                    return
+                delay = min(pending.next_check for pending in self._pending.values()) - time.monotonic()
+                if delay > 0:
+                    # track() notifies so a new command's fast first check isn't delayed
+                    self._condition.wait(delay)
+                    continue
+            self._poll()
+
+    def _poll(self) -> None:
+        """Fetch command states once and reschedule whatever is still running."""
+        try:
+            commands = {command["id"]: command for command in self._fetch("command")}
+        except requests.RequestException as e:
+            logger.warning(f"[{self.name}] Failed to poll command queue: {e}")
+            commands = {}
+
+        with self._condition:
+            due = [pending for pending in self._pending.values() if pending.next_check <= time.monotonic()]
+
+        for pending in due:
+            command = commands.get(pending.command_id)
+            if command is None:
+                # Completed commands are eventually pruned from the list
+                try:
+                    command = self._fetch(f"command/{pending.command_id}")
+                except requests.RequestException as e:
+                    logger.warning(f"[{self.name}] Failed to get status of command {pending.command_id}: {e}")
+                    command = None
+            if command is not None:
+                self.update(command)
+            with self._condition:
+                if pending.command_id in self._pending:
+                    self._schedule(pending)
+
+    def _schedule(self, pending: _PendingCommand) -> None:
+        """
+        Pick the next check time for a command that is still running.
+
+        Before the expected completion time, halve the remaining time each check so
+        the tick converges on the actual end; afterwards back off exponentially.
+        Must be called with the condition held.
+        """
+        now = time.monotonic()
+        if self._push_active:
+            pending.next_check = now + PUSH_SAFETY_INTERVAL_SECONDS
+            return
+        expected = self._seconds_per_item.get(pending.name, FALLBACK_COMMAND_SECONDS) * pending.weight
+        remaining = pending.submitted_at + expected - now
+        if remaining > 0:
+            delay = remaining / 2
+        else:
+            pending.overdue_checks += 1
+            delay = MIN_INTERVAL_SECONDS * 2**pending.overdue_checks
+        pending.next_check = now + min(max(delay, MIN_INTERVAL_SECONDS), MAX_INTERVAL_SECONDS)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrently processed work units, driven by the server's command queue.
+
+    Every LIMIT_SAMPLE_SECONDS (checked when a unit starts or finishes) the server's
+    /command list is sampled. If commands are waiting for a server worker, or recent
+    commands take much longer than usual, the limit is halved; if neither holds and
+    all slots are busy, it grows by one. The *arr command executor runs only a few
+    commands at a time, so anything queued beyond that delays the server's own
+    tasks (RSS sync, imports) and the UI.
+    """
+
+    def __init__(self, tracker: CommandTracker, max_limit: int, min_limit: int = 1):
+        """
+        Initialize the limiter at half the maximum.
+
+        Args:
+            tracker: Command tracker of the same service (queue sampling and latency)
+            max_limit: Upper bound on the limit (the configured concurrency)
+            min_limit: Lower bound on the limit
+        """
+        self.tracker = tracker
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max(min_limit, max_limit // 2)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._next_sample = time.monotonic() + LIMIT_SAMPLE_SECONDS
+        self._sampling = False
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one slot for the duration of a work unit."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self) -> None:
+        """Block until a slot is free under the current limit."""
+        while True:
+            with self._condition:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                self._condition.wait(LIMIT_SAMPLE_SECONDS)
+            # Waiting workers keep sampling so the limit can grow while all slots are busy
+            self._adjust()
+
+    def release(self) -> None:
+        """Free a slot."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+        self._adjust()
+
+    def _adjust(self) -> None:
+        """Sample the server (if due) and apply one AIMD step."""
+        with self._condition:
+            if self._sampling or time.monotonic() < self._next_sample:
+                return
+            self._sampling = True
+        try:
+            queued, started = self.tracker.server_queue()
+        except requests.RequestException as e:
+            logger.debug(f"[{self.tracker.name}] Could not sample command queue: {e}")
+            queued = started = None
+
+        with self._condition:
+            self._sampling = False
+            self._next_sample = time.monotonic() + LIMIT_SAMPLE_SECONDS
+            if queued is None:
+                return
+            latency_ratio = self.tracker.latency_ratio
+            previous = self.limit
+            if queued > MAX_QUEUED_COMMANDS or latency_ratio > LATENCY_TOLERANCE:
+                self.limit = max(self.min_limit, int(self.limit * DECREASE_FACTOR))
+            elif self._in_flight >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+            if self.limit == previous:
+                return
+            self._condition.notify_all()
+
+        message = (
+            f"[{self.tracker.name}] Concurrency {previous} -> {self.limit} "
+            f"(server queue: {queued} queued, {started} started; latency x{latency_ratio:.1f})"
+        )
+        if self.limit < previous:
+            logger.info(message)
+        else:
+            logger.debug(message)
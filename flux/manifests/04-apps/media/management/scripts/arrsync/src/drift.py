@@ -0,0 +1,109 @@
+"""
+Codec drift detection for arrSync.
+
+After tdarr re-encodes a file, the *arr service's rescan reports the new codec in
+the file's mediaInfo, but the file name still carries the old codec token (e.g.
+"x264" for what is now HEVC) until the file is renamed. Comparing the two finds
+exactly the files arrSync exists to fix, without refreshing the whole library.
+
+Codec names are normalized to families, so "x265", "h265" and "HEVC" agree, as do
+"DTS" and "DTS-HD MA". A file is drifted only if its name mentions a codec of the
+same kind (video or audio) and none of the mentioned ones matches the detected
+codec; names without codec tokens and files without mediaInfo never count.
+"""
+
+import re
+from pathlib import PurePosixPath
+from typing import Any
+
+# Lowercase name token -> video codec family
+VIDEO_TOKENS = {
+    "x264": "h264",
+    "h264": "h264",
+    "avc": "h264",
+    "x265": "h265",
+    "h265": "h265",
+    "hevc": "h265",
+    "av1": "av1",
+    "vp9": "vp9",
+    "xvid": "mpeg4",
+    "divx": "mpeg4",
+    "mpeg4": "mpeg4",
+    "mpeg2": "mpeg2",
+    "vc1": "vc1",
+}
+
+# Audio tokens often carry a channel layout ("AAC2.0", "DDP5.1"), so they are matched as prefixes
+AUDIO_PATTERNS = [
+    (re.compile(r"^(eac3|ddp|dd\+)\d*$"), "eac3"),
+    (re.compile(r"^(ac3|dd)\d*$"), "ac3"),
+    (re.compile(r"^aac\d*$"), "aac"),
+    (re.compile(r"^dts"), "dts"),
+    (re.compile(r"^truehd$"), "truehd"),
+    (re.compile(r"^flac$"), "flac"),
+    (re.compile(r"^mp3$"), "mp3"),
+    (re.compile(r"^opus$"), "opus"),
+    (re.compile(r"^vorbis$"), "vorbis"),
+    (re.compile(r"^l?pcm$"), "pcm"),
+]
+
+TOKEN_SEPARATOR = re.compile(r"[^a-z0-9+]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return [token for token in TOKEN_SEPARATOR.split(text.lower()) if token]
+
+
+def video_families(text: str) -> set[str]:
+    """Video codec families named in a file name or mediaInfo value."""
+    return {VIDEO_TOKENS[token] for token in _tokens(text) if token in VIDEO_TOKENS}
+
+
+def audio_families(text: str) -> set[str]:
+    """Audio codec families named in a file name or mediaInfo value."""
+    return {family for token in _tokens(text) for pattern, family in AUDIO_PATTERNS if pattern.match(token)}
+
+
+def file_drift(file: dict[str, Any]) -> str | None:
+    """
+    Describe how a file's name disagrees with its detected codecs.
+
+    Args:
+        file: Episode/movie/track file object with relativePath or path and mediaInfo
+
+    Returns:
+        Description such as "x264 -> h265" (named codec -> detected family), or None if
+        the name agrees with the detected codecs or either side is unknown
+    """
+    name = PurePosixPath(file.get("relativePath") or file.get("path") or "").stem
+    media_info = file.get("mediaInfo") or {}
+    if not name or not media_info:
+        return None
+
+    for families, detected in (
+        (video_families, media_info.get("videoCodec") or ""),
+        (audio_families, media_info.get("audioCodec") or ""),
+    ):
+        named = families(name)
+        actual = families(detected)
+        if named and actual and not named & actual:
+            return f"{'/'.join(sorted(named))} -> {'/'.join(sorted(actual))}"
+    return None
+
+
+def drifted_files(files: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    """
+    Find the files of an item whose names disagree with their detected codecs.
+
+    Args:
+        files: Episode/movie/track file objects of one item
+
+    Returns:
+        (file name, drift description) per drifted file
+    """
+    drifted = []
+    for file in files:
+        drift = file_drift(file)
+        if drift is not None:
+            drifted.append((PurePosixPath(file.get("relativePath") or file.get("path") or "").name, drift))
+    return drifted
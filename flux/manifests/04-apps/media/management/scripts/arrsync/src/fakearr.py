@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+fakearr - Local stand-in for Sonarr/Radarr/Lidarr used to exercise arrSync offline.
+
+Serves the subset of the *arr API that arrSync uses (v1 and v3 paths are treated
+the same) and the /signalr/messages hub, so both command polling and pushed
+command completion can be tested without a real server:
+
+    python fakearr.py --port 8989 --items 200
+    SONARR_URL=http://127.0.0.1:8989 SONARR_API_KEY=test python arrsync.py sonarr --completion signalr
+
+Commands move through queued -> started -> completed after a configurable delay
+and every status change is broadcast to connected SignalR clients. Like the real
+command executor, only a few commands run at once (--workers); the rest stay queued.
+
+Command durations follow a configurable distribution, API responses can be delayed,
+and commands or requests can fail at a given rate, so bench.py can measure arrSync
+under realistic conditions. A fraction of the items has renames pending until a
+rename command for them completes.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import math
+import random
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger("fakearr")
+
+# RFC 6455 magic value for the Sec-WebSocket-Accept header
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+RECORD_SEPARATOR = "\x1e"
+
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+# Spread of the lognormal command duration distribution (sigma of the underlying normal)
+LOGNORMAL_SIGMA = 1.0
+
+DISTRIBUTIONS = ("fixed", "exponential", "lognormal")
+
+# Finished commands are dropped after this long, like the *arr command queue does
+COMMAND_RETENTION_SECONDS = 300
+
+
+def _timestamp() -> str:
+    """Current time in the ISO 8601 format the *arr APIs use."""
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class WebSocketConnection:
+    """Minimal server side of an RFC 6455 connection (text frames, ping/pong, close)."""
+
+    def __init__(self, handler: StreamRequestHandler):
+        self._rfile = handler.rfile
+        self._wfile = handler.wfile
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    def send_text(self, text: str) -> None:
+        """Send a single unmasked text frame."""
+        self._send_frame(OPCODE_TEXT, text.encode())
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        with self._send_lock:
+            if self.closed:
+                return
+            try:
+                self._wfile.write(header + payload)
+                self._wfile.flush()
+            except OSError:
+                self.closed = True
+
+    def receive_text(self) -> str | None:
+        """
+        Read frames until a text message arrives, answering pings along the way.
+
+        Returns:
+            Decoded text, or None once the client closed the connection
+        """
+        while True:
+            header = self._rfile.read(2)
+            if len(header) < 2:
+                return None
+            opcode = header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._rfile.read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._rfile.read(8))[0]
+            # Clients must mask every frame they send
+            mask = self._rfile.read(4) if header[1] & 0x80 else b"\x00\x00\x00\x00"
+            payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(self._rfile.read(length)))
+
+            if opcode == OPCODE_CLOSE:
+                self._send_frame(OPCODE_CLOSE, payload[:2])
+                self.closed = True
+                return None
+            if opcode == OPCODE_PING:
+                self._send_frame(OPCODE_PONG, payload)
+            elif opcode == OPCODE_TEXT:
+                return payload.decode()
+
+
+class FakeArr:
+    """
+    In-memory *arr library and command queue.
+
+    Attributes:
+        items: Library items (series/movies/artists share one shape)
+        command_seconds: Mean simulated command duration
+        request_counts: Requests served, keyed by method and resource (e.g., "GET rename")
+    """
+
+    def __init__(
+        self,
+        item_count: int,
+        command_seconds: float,
+        seed: int = 0,
+        workers: int = 3,
+        distribution: str = "exponential",
+        failure_rate: float = 0.0,
+        http_failure_rate: float = 0.0,
+        http_latency: float = 0.0,
+        rename_fraction: float = 0.0,
+    ):
+        """
+        Build a library of synthetic items.
+
+        Args:
+            item_count: Number of series/movies/artists
+            command_seconds: Mean simulated command duration in seconds
+            seed: Random seed so runs are reproducible
+            workers: Commands executed at once (Sonarr/Radarr/Lidarr run 3)
+            distribution: Command duration distribution ("fixed", "exponential" or "lognormal")
+            failure_rate: Probability that a command ends as failed
+            http_failure_rate: Probability that an API request (other than SignalR) returns HTTP 500
+            http_latency: Seconds added to every API response
+            rename_fraction: Fraction of items whose files need renaming
+        """
+        self.random = random.Random(seed)
+        self.command_seconds = command_seconds
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.http_failure_rate = http_failure_rate
+        self.http_latency = http_latency
+        self.request_counts: Counter[str] = Counter()
+        self._workers = threading.Semaphore(workers)
+        self.items = [
+            {
+                "id": item_id,
+                "title": f"Item {item_id}",
+                "artistName": f"Item {item_id}",
+                "path": f"/media/item-{item_id}",
+                "added": _timestamp(),
+            }
+            for item_id in range(1, item_count + 1)
+        ]
+        self.commands: dict[int, dict[str, Any]] = {}
+        # Monotonic end time of finished commands still in self.commands
+        self._command_ended: dict[int, float] = {}
+        self.subscribers: list[WebSocketConnection] = []
+        self._lock = threading.Lock()
+        self._next_command_id = 1
+        self.pending_renames = {item["id"] for item in self.items if self.random.random() < rename_fraction}
+
+    def command_duration(self) -> float:
+        """Draw a command duration with mean command_seconds from the configured distribution."""
+        if self.command_seconds <= 0:
+            return 0.0
+        with self._lock:
+            if self.distribution == "fixed":
+                return self.command_seconds
+            if self.distribution == "lognormal":
+                mu = math.log(self.command_seconds) - LOGNORMAL_SIGMA**2 / 2
+                return self.random.lognormvariate(mu, LOGNORMAL_SIGMA)
+            return self.random.expovariate(1 / self.command_seconds)
+
+    def chance(self, probability: float) -> bool:
+        """Return True with the given probability (thread-safe, reproducible per seed)."""
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.random.random() < probability
+
+    def rename_preview(self, item_id: int) -> list[dict[str, Any]]:
+        """Rename preview: one file to rename for items with pending renames."""
+        if item_id not in self.pending_renames:
+            return []
+        return [{"existingPath": f"Item {item_id} - 00 x264.mkv", "newPath": f"Item {item_id} - 00 x265.mkv"}]
+
+    def files_for(self, item_id: int) -> list[dict[str, Any]]:
+        """Synthetic media files of an item; the first file of items pending a rename still says x264."""
+        files = []
+        for index in range(3):
+            codec = " x264" if index == 0 and item_id in self.pending_renames else ""
+            name = f"Item {item_id} - {index:02d}{codec}.mkv"
+            files.append(
+                {
+                    "id": item_id * 100 + index,
+                    "seriesId": item_id,
+                    "movieId": item_id,
+                    "artistId": item_id,
+                    "size": 1_000_000 * (index + 1),
+                    "dateAdded": self.items[0]["added"],
+                    "relativePath": name,
+                    "path": f"/media/item-{item_id}/{name}",
+                    "mediaInfo": {"videoCodec": "x265", "audioCodec": "AAC"},
+                }
+            )
+        return files
+
+    def history(self) -> dict[str, Any]:
+        """Import history (Sonarr's GET /history): every fifth item, newest (highest ID) first."""
+        records = [
+            {"id": item["id"], "seriesId": item["id"], "eventType": "downloadFolderImported", "date": _timestamp()}
+            for item in self.items
+            if item["id"] % 5 == 0
+        ]
+        records.reverse()
+        return {"page": 1, "pageSize": len(records), "totalRecords": len(records), "records": records}
+
+    def albums(self) -> list[dict[str, Any]]:
+        """One synthetic album per item (Lidarr's GET /album)."""
+        return [
+            {"id": item["id"], "artistId": item["id"], "title": item["title"], "statistics": {"trackFileCount": 3}}
+            for item in self.items
+        ]
+
+    def list_commands(self) -> list[dict[str, Any]]:
+        """Queued and running commands plus those finished within COMMAND_RETENTION_SECONDS (GET /command)."""
+        with self._lock:
+            self._prune_commands()
+            return [dict(command) for command in self.commands.values()]
+
+    def get_command(self, command_id: int) -> dict[str, Any] | None:
+        """A command by ID (GET /command/{id}), None once it was pruned."""
+        with self._lock:
+            self._prune_commands()
+            command = self.commands.get(command_id)
+            return dict(command) if command else None
+
+    def _prune_commands(self) -> None:
+        """Drop commands that finished more than COMMAND_RETENTION_SECONDS ago; the caller holds the lock."""
+        cutoff = time.monotonic() - COMMAND_RETENTION_SECONDS
+        for command_id, ended in list(self._command_ended.items()):
+            if ended < cutoff:
+                del self._command_ended[command_id]
+                del self.commands[command_id]
+
+    def submit(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Queue a command and start simulating it."""
+        with self._lock:
+            self._prune_commands()
+            command_id = self._next_command_id
+            self._next_command_id += 1
+            command = {
+                "id": command_id,
+                "name": body.get("name"),
+                "commandName": body.get("name"),
+                "body": body,
+                "status": "queued",
+                "queued": _timestamp(),
+                "trigger": "manual",
+            }
+            self.commands[command_id] = command
+        threading.Thread(target=self._execute, args=(command,), daemon=True).start()
+        return dict(command)
+
+    def _execute(self, command: dict[str, Any]) -> None:
+        """Wait for a free worker, then advance the command through its states, broadcasting each change."""
+        with self._workers:
+            self._set_status(command, "started", "started")
+            time.sleep(self.command_duration())
+            if self.chance(self.failure_rate):
+                self._set_status(command, "failed", "ended", message="Simulated failure")
+                return
+            if command["name"] in ("RenameSeries", "RenameMovie", "RenameFiles"):
+                body = command["body"]
+                item_ids = body.get("seriesIds") or body.get("movieIds") or [body.get("artistId")]
+                with self._lock:
+                    self.pending_renames.difference_update(item_ids)
+            self._set_status(command, "completed", "ended")
+
+    def _set_status(self, command: dict[str, Any], status: str, timestamp_field: str, message: str = "") -> None:
+        with self._lock:
+            command["status"] = status
+            if message:
+                command["message"] = message
+            command[timestamp_field] = _timestamp()
+            if timestamp_field == "ended":
+                self._command_ended[command["id"]] = time.monotonic()
+            snapshot = dict(command)
+            subscribers = list(self.subscribers)
+        message = {
+            "type": 1,
+            "target": "receiveMessage",
+            "arguments": [{"name": "command", "body": {"resource": snapshot, "action": "updated"}}],
+        }
+        for subscriber in subscribers:
+            subscriber.send_text(json.dumps(message) + RECORD_SEPARATOR)
+
+
+class FakeArrHandler(BaseHTTPRequestHandler):
+    """HTTP handler routing *arr API and SignalR requests to the FakeArr."""
+
+    protocol_version = "HTTP/1.1"
+    server: "FakeArrServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self) -> tuple[list[str], dict[str, list[str]]]:
+        """Split the request into API path segments (after /api/vN/) and query parameters."""
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        if segments[:1] == ["api"]:
+            segments = segments[2:]
+        return segments, parse_qs(parts.query)
+
+    def _simulate(self, method: str, resource: str) -> bool:
+        """
+        Count the request and apply the configured latency and error rate.
+
+        Returns:
+            True if the request should be served, False if an error was sent instead
+        """
+        fake = self.server.fake
+        with fake._lock:
+            fake.request_counts[f"{method} {resource}"] += 1
+        if fake.http_latency > 0:
+            time.sleep(fake.http_latency)
+        if fake.chance(fake.http_failure_rate):
+            self._send_json({"message": "Simulated server error"}, 500)
+            return False
+        return True
+
+    def do_GET(self) -> None:
+        if self.headers.get("Upgrade", "").lower() == "websocket":
+            self._serve_signalr()
+            return
+
+        fake = self.server.fake
+        segments, query = self._route()
+        resource = segments[0] if segments else ""
+        if not self._simulate("GET", resource):
+            return
+
+        if resource == "movie":
+            # Radarr embeds the movie file in the listing
+            movies = [{**item, "hasFile": True, "movieFile": fake.files_for(item["id"])[0]} for item in fake.items]
+            self._send_json(movies)
+        elif resource in ("series", "artist"):
+            self._send_json(fake.items)
+        elif resource == "history":
+            self._send_json(fake.history())
+        elif resource == "album":
+            self._send_json(fake.albums())
+        elif resource == "trackfile" and "albumId" in query:
+            self._send_json([file for album_id in query["albumId"] for file in fake.files_for(int(album_id))])
+        elif resource in ("episodefile", "moviefile", "trackfile"):
+            item_id = int(next(iter(query.values()), ["0"])[0])
+            self._send_json(fake.files_for(item_id))
+        elif resource == "rename":
+            self._send_json(fake.rename_preview(int(next(iter(query.values()), ["0"])[0])))
+        elif resource == "command" and len(segments) == 2:
+            command = fake.get_command(int(segments[1]))
+            self._send_json(command if command else {"message": "Not found"}, 200 if command else 404)
+        elif resource == "command":
+            self._send_json(fake.list_commands())
+        else:
+            self._send_json({"message": "Not found"}, 404)
+
+    def do_POST(self) -> None:
+        segments, _ = self._route()
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        if segments[-1:] == ["negotiate"]:
+            self._send_json(
+                {
+                    "negotiateVersion": 1,
+                    "connectionId": uuid.uuid4().hex,
+                    "connectionToken": uuid.uuid4().hex,
+                    "availableTransports": [{"transport": "WebSockets", "transferFormats": ["Text"]}],
+                }
+            )
+        elif segments[:1] == ["command"]:
+            if self._simulate("POST", "command"):
+                self._send_json(self.server.fake.submit(body), 201)
+        else:
+            self._send_json({"message": "Not found"}, 404)
+
+    def _serve_signalr(self) -> None:
+        """Upgrade to a WebSocket and speak the SignalR JSON hub protocol."""
+        key = self.headers["Sec-WebSocket-Key"]
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()  # noqa: S324
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        connection = WebSocketConnection(self)
+        # Handshake request ({"protocol":"json","version":1}) is answered with an empty object
+        if connection.receive_text() is None:
+            return
+        connection.send_text("{}" + RECORD_SEPARATOR)
+
+        fake = self.server.fake
+        with fake._lock:
+            fake.subscribers.append(connection)
+        try:
+            while connection.receive_text() is not None:
+                pass  # client pings need no reply beyond keeping the socket open
+        finally:
+            with fake._lock:
+                fake.subscribers.remove(connection)
+
+
+class FakeArrServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying a FakeArr instance."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], fake: FakeArr):
+        super().__init__(address, FakeArrHandler)
+        self.fake = fake
+
+
+def main() -> int:
+    """Run the fake server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in *arr server for arrSync testing")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8989, help="Port to listen on (default: 8989)")
+    parser.add_argument("--items", type=int, default=100, help="Library size (default: 100)")
+    parser.add_argument("--command-seconds", type=float, default=0.5, help="Mean command duration (default: 0.5)")
+    parser.add_argument("--workers", type=int, default=3, help="Commands executed at once (default: 3)")
+    parser.add_argument(
+        "--distribution", choices=DISTRIBUTIONS, default="exponential", help="Command duration distribution"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a command fails")
+    parser.add_argument("--http-failure-rate", type=float, default=0.0, help="Probability of an HTTP 500")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Seconds added to every API response")
+    parser.add_argument("--rename-fraction", type=float, default=0.0, help="Fraction of items needing a rename")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    fake = FakeArr(
+        args.items,
+        args.command_seconds,
+        workers=args.workers,
+        distribution=args.distribution,
+        failure_rate=args.failure_rate,
+        http_failure_rate=args.http_failure_rate,
+        http_latency=args.http_latency,
+        rename_fraction=args.rename_fraction,
+    )
+    server = FakeArrServer((args.host, args.port), fake)
+    logger.info(f"Serving fake *arr with {args.items} items on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
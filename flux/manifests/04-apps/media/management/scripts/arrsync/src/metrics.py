@@ -0,0 +1,270 @@
+"""
+Metrics for arrSync runs.
+
+Records where a run spends its time: HTTP latency per endpoint, how long commands
+wait in the *arr command queue versus how long the server takes to execute them,
+the duration of each sync phase, item throughput and failures by service and phase.
+
+Every measurement goes to two places:
+- OpenTelemetry instruments, if the OpenTelemetry API is importable. The OTel
+  operator injects the SDK into the pods (instrumentation.opentelemetry.io/inject-python),
+  which exports them over OTLP; without it the API is a no-op.
+- An in-process registry that is rendered in the Prometheus text format, for the
+  webhook server's /metrics endpoint, a node-exporter textfile or a Pushgateway.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; commands range from sub-second renames to multi-minute batched refreshes
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+# name: (type, help); counters get a _total suffix in the Prometheus output
+METRICS: dict[str, tuple[str, str]] = {
+    "arrsync_http_request_duration_seconds": ("histogram", "Latency of *arr API requests"),
+    "arrsync_command_queue_seconds": ("histogram", "Time commands waited in the *arr command queue"),
+    "arrsync_command_execution_seconds": ("histogram", "Time the *arr server spent executing commands"),
+    "arrsync_commands": ("counter", "Commands finished, by final status"),
+    "arrsync_phase_duration_seconds": ("histogram", "Duration of sync phases (list, prefetch, refresh, rename...)"),
+    "arrsync_items": ("counter", "Items processed, by result"),
+    "arrsync_item_failures": ("counter", "Items that failed, by phase"),
+    "arrsync_items_per_second": ("gauge", "Throughput of the last sync"),
+    "arrsync_drifted_items": ("gauge", "Items with files named for a codec other than the detected one"),
+    "arrsync_last_success_timestamp_seconds": ("gauge", "When the last sync without failures finished"),
+}
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:
+    otel_metrics = None
+
+
+@dataclass
+class _Histogram:
+    """Cumulative histogram state of one label set."""
+
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+class Registry:
+    """Thread-safe store of counters, gauges and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._instruments: dict[str, Any] = {}
+        self._meter = otel_metrics.get_meter("arrsync") if otel_metrics is not None else None
+
+    def _instrument(self, name: str) -> Any:
+        """Get or create the OpenTelemetry instrument for a metric (None without OpenTelemetry)."""
+        if self._meter is None:
+            return None
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            kind, description = METRICS[name]
+            unit = "s" if name.endswith("_seconds") else "1"
+            if kind == "histogram":
+                instrument = self._meter.create_histogram(name, unit=unit, description=description)
+            elif kind == "counter":
+                instrument = self._meter.create_counter(name, unit=unit, description=description)
+            elif hasattr(self._meter, "create_gauge"):
+                instrument = self._meter.create_gauge(name, unit=unit, description=description)
+            self._instruments[name] = instrument
+        return instrument
+
+    def inc(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+            instrument = self._instrument(name)
+        if instrument is not None:
+            instrument.add(value, labels)
+
+    def set(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+            instrument = self._instrument(name)
+        if instrument is not None:
+            instrument.set(value, labels)
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, _Histogram()).observe(value)
+            instrument = self._instrument(name)
+        if instrument is not None:
+            instrument.record(value, labels)
+
+    def render(self, extra_labels: dict[str, str] | None = None) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            extra_labels: Labels added to every sample (e.g., the shard of a textfile)
+
+        Returns:
+            Exposition text, one HELP/TYPE block per metric
+        """
+        extra = tuple(sorted((extra_labels or {}).items()))
+        lines: list[str] = []
+        with self._lock:
+            for name, (kind, description) in METRICS.items():
+                exposed = f"{name}_total" if kind == "counter" else name
+                values = self._values.get(name, {})
+                histograms = self._histograms.get(name, {})
+                if not values and not histograms:
+                    continue
+                lines.append(f"# HELP {exposed} {description}")
+                lines.append(f"# TYPE {exposed} {kind}")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{exposed}{_format_labels(key + extra)} {_format_value(value)}")
+                for key, histogram in sorted(histograms.items()):
+                    labels = key + extra
+                    for bound, count in zip(DURATION_BUCKETS, histogram.bucket_counts, strict=True):
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+_registry = Registry()
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    """
+    Increment a counter.
+
+    Args:
+        name: Metric name from METRICS (without _total)
+        value: Amount to add
+        **labels: Label values (e.g., service="Sonarr", phase="refresh")
+    """
+    _registry.inc(name, value, labels)
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    """
+    Set a gauge.
+
+    Args:
+        name: Metric name from METRICS
+        value: New value
+        **labels: Label values
+    """
+    _registry.set(name, value, labels)
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    """
+    Record a duration in a histogram.
+
+    Args:
+        name: Metric name from METRICS
+        seconds: Observed duration
+        **labels: Label values
+    """
+    _registry.observe(name, max(seconds, 0.0), labels)
+
+
+@contextmanager
+def timer(name: str, **labels: str) -> Iterator[None]:
+    """Record the duration of the enclosed block in a histogram, also when it raises."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - started, **labels)
+
+
+def render() -> str:
+    """Render the current metrics in the Prometheus text format (e.g., for a /metrics endpoint)."""
+    return _registry.render()
+
+
+def export(
+    textfile: Path | None = None, pushgateway: str | None = None, grouping: dict[str, str] | None = None
+) -> None:
+    """
+    Export the metrics of a finished run.
+
+    Failures are logged, never raised: metrics must not fail a sync.
+
+    Args:
+        textfile: Path of a node-exporter textfile collector file; written atomically
+        pushgateway: Pushgateway base URL; the metrics replace the group's previous push
+        grouping: Labels identifying this process (e.g., {"shard": "0"}); added to the
+            textfile samples and used as the Pushgateway grouping key
+    """
+    grouping = grouping or {}
+    if textfile is not None:
+        try:
+            textfile.parent.mkdir(parents=True, exist_ok=True)
+            temporary = textfile.with_name(f".{textfile.name}.{os.getpid()}")
+            temporary.write_text(_registry.render(grouping))
+            temporary.replace(textfile)
+            logger.debug(f"Wrote metrics to {textfile}")
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {textfile}: {e}")
+
+    if pushgateway:
+        path = "".join(f"/{quote(key, safe='')}/{quote(value, safe='')}" for key, value in grouping.items())
+        url = f"{pushgateway.rstrip('/')}/metrics/job/arrsync{path}"
+        try:
+            response = requests.put(
+                url,
+                data=_registry.render().encode(),
+                headers={"Content-Type": "text/plain; version=0.0.4"},
+                timeout=10,
+            )
+            response.raise_for_status()
+            logger.debug(f"Pushed metrics to {url}")
+        except requests.RequestException as e:
+            logger.warning(f"Could not push metrics to {pushgateway}: {e}")
+
+    # The SDK exports periodically; flush so a short-lived Job doesn't exit with unsent data
+    if otel_metrics is not None:
+        force_flush = getattr(otel_metrics.get_meter_provider(), "force_flush", None)
+        if force_flush is not None:
+            force_flush()
@@ -0,0 +1,210 @@
+"""
+Push-based command completion for arrSync.
+
+Sonarr, Radarr and Lidarr broadcast model changes, including command status
+updates, over an ASP.NET Core SignalR hub at /signalr/messages (the same stream
+their web UI uses). A SignalRListener subscribes once per service and feeds those
+updates into the client's CommandTracker, so waiting commands resolve as soon as
+the server reports them finished instead of on the next poll.
+
+Only the JSON hub protocol over WebSockets is implemented, which is all the *arr
+applications offer besides long polling.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any
+from urllib.parse import quote, urlsplit, urlunsplit
+
+import requests
+
+from commands import CommandTracker
+
+logger = logging.getLogger(__name__)
+
+# SignalR JSON protocol: every message is terminated by the ASCII record separator
+RECORD_SEPARATOR = "\x1e"
+MESSAGE_INVOCATION = 1
+MESSAGE_PING = 6
+MESSAGE_CLOSE = 7
+
+# The server drops clients that stay silent for 30s, so ping well within that
+PING_INTERVAL_SECONDS = 15.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+MAX_RECONNECT_SECONDS = 60.0
+
+
+class SignalRListener:
+    """
+    Subscribe to an *arr SignalR message stream and resolve tracked commands.
+
+    While connected, the tracker is switched to push mode (it only runs slow
+    safety polls). When the socket drops, the tracker immediately resumes
+    normal polling and the listener reconnects in the background with backoff.
+    """
+
+    def __init__(self, name: str, url: str, api_key: str, tracker: CommandTracker):
+        """
+        Initialize the listener (call start() to connect).
+
+        Args:
+            name: Service name for log messages
+            url: Service base URL (e.g., "http://sonarr.sonarr.svc.cluster.local")
+            api_key: Service API key, sent as the SignalR access token
+            tracker: Tracker whose commands are resolved from pushed updates
+        """
+        self.name = name
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        self.tracker = tracker
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        # Set once the first connection attempt has succeeded or failed
+        self._attempted = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, wait_seconds: float = CONNECT_TIMEOUT_SECONDS) -> bool:
+        """
+        Start the listener thread and wait briefly for the first connection.
+
+        Args:
+            wait_seconds: How long to wait for the connection before returning
+
+        Returns:
+            True if connected, False if commands will be polled for now
+        """
+        try:
+            import websockets.sync.client  # noqa: F401
+        except ImportError:
+            logger.warning(f"[{self.name}] websockets is not installed, using command polling")
+            return False
+
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-signalr", daemon=True)
+        self._thread.start()
+        self._attempted.wait(wait_seconds)
+        connected = self._connected.is_set()
+        if not connected:
+            logger.warning(f"[{self.name}] SignalR stream unavailable, using command polling until it connects")
+        return connected
+
+    def stop(self) -> None:
+        """Stop the listener and return the tracker to polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=PING_INTERVAL_SECONDS)
+        self.tracker.set_push(False)
+
+    def _negotiate(self) -> str:
+        """
+        Perform the SignalR negotiate handshake.
+
+        Returns:
+            WebSocket URL including the connection token
+
+        Raises:
+            requests.RequestException: If negotiation fails
+        """
+        response = requests.post(
+            f"{self.url}/signalr/messages/negotiate",
+            params={"negotiateVersion": 1, "access_token": self.api_key},
+            timeout=CONNECT_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        negotiation = response.json()
+        token = negotiation.get("connectionToken") or negotiation["connectionId"]
+
+        parts = urlsplit(self.url)
+        scheme = "wss" if parts.scheme == "https" else "ws"
+        query = f"id={quote(token)}&access_token={quote(self.api_key)}"
+        return urlunsplit((scheme, parts.netloc, f"{parts.path}/signalr/messages", query, ""))
+
+    def _run(self) -> None:
+        """Connect, consume messages, and reconnect with backoff until stopped."""
+        from websockets.exceptions import WebSocketException
+
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._consume(self._negotiate())
+                backoff = 1.0
+            except (requests.RequestException, WebSocketException, OSError, ValueError, KeyError) as e:
+                logger.debug(f"[{self.name}] SignalR connection failed: {e}")
+            except Exception:
+                # Never let the thread die: the tracker must fall back to polling
+                logger.warning(f"[{self.name}] Unexpected SignalR error, reconnecting", exc_info=True)
+            self._attempted.set()
+            if self._connected.is_set():
+                self._connected.clear()
+                if not self._stop.is_set():
+                    logger.warning(f"[{self.name}] SignalR stream disconnected, falling back to command polling")
+            self.tracker.set_push(False)
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_RECONNECT_SECONDS)
+
+    def _consume(self, ws_url: str) -> None:
+        """
+        Run one WebSocket session until it closes or the listener is stopped.
+
+        Args:
+            ws_url: URL returned by _negotiate()
+        """
+        from websockets.sync.client import connect
+
+        with connect(ws_url, open_timeout=CONNECT_TIMEOUT_SECONDS) as websocket:
+            websocket.send(json.dumps({"protocol": "json", "version": 1}) + RECORD_SEPARATOR)
+            handshake = json.loads(websocket.recv(timeout=CONNECT_TIMEOUT_SECONDS).rstrip(RECORD_SEPARATOR))
+            if handshake.get("error"):
+                raise ValueError(f"SignalR handshake rejected: {handshake['error']}")
+
+            logger.info(f"[{self.name}] Connected to SignalR stream, using pushed command updates")
+            self._connected.set()
+            self._attempted.set()
+            self.tracker.set_push(True)
+
+            last_ping = time.monotonic()
+            while not self._stop.is_set():
+                if time.monotonic() - last_ping >= PING_INTERVAL_SECONDS:
+                    websocket.send(json.dumps({"type": MESSAGE_PING}) + RECORD_SEPARATOR)
+                    last_ping = time.monotonic()
+                try:
+                    frame = websocket.recv(timeout=1.0)
+                except TimeoutError:
+                    continue
+                if isinstance(frame, bytes):
+                    frame = frame.decode()
+                for record in frame.split(RECORD_SEPARATOR):
+                    if record and not self._handle(json.loads(record)):
+                        return
+
+    def _handle(self, message: Any) -> bool:
+        """
+        Dispatch one hub message.
+
+        Args:
+            message: Decoded SignalR message (anything JSON; non-objects are ignored)
+
+        Returns:
+            False if the server closed the session
+        """
+        if not isinstance(message, dict):
+            return True
+        message_type = message.get("type")
+        if message_type == MESSAGE_CLOSE:
+            logger.debug(f"[{self.name}] SignalR server closed the session: {message.get('error')}")
+            return False
+        if message_type != MESSAGE_INVOCATION or message.get("target") != "receiveMessage":
+            return True
+
+        arguments = message.get("arguments")
+        for argument in arguments if isinstance(arguments, list) else []:
+            if not isinstance(argument, dict) or argument.get("name") != "command":
+                continue
+            body = argument.get("body")
+            if not isinstance(body, dict):
+                continue
+            resource = body.get("resource", body)
+            if isinstance(resource, dict) and "id" in resource:
+                self.tracker.update(resource)
+        return True
@@ -0,0 +1,160 @@
+"""
+Persistent state for arrSync runs.
+
+Stores per-item fingerprints in a SQLite database so nightly runs can skip
+series/movies/artists whose files have not changed since the last successful sync,
+and per-phase checkpoints so an interrupted run can resume where it stopped.
+The database lives on a PersistentVolumeClaim in the cluster (see pvc.yaml).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout changes; older databases are migrated in _migrate()
+SCHEMA_VERSION = 2
+
+
+class StateStore:
+    """
+    SQLite-backed store for arrSync state.
+
+    A single connection is shared between worker threads and guarded by a lock;
+    writes are tiny and infrequent compared to *arr command latency, so this is
+    simpler than a connection per thread and never contends in practice.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the state database.
+
+        Args:
+            path: Path to the SQLite database file; parent directories are created
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL keeps readers and the single writer from blocking each other
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        logger.debug(f"Opened state database {path}")
+
+    def _migrate(self) -> None:
+        """Create tables for the current schema version."""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS fingerprints (
+                        service TEXT NOT NULL,
+                        item_id INTEGER NOT NULL,
+                        fingerprint TEXT NOT NULL,
+                        synced_at REAL NOT NULL,
+                        PRIMARY KEY (service, item_id)
+                    )
+                    """
+                )
+            if version < 2:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS checkpoints (
+                        service TEXT NOT NULL,
+                        phase TEXT NOT NULL,
+                        item_id INTEGER NOT NULL,
+                        completed_at REAL NOT NULL,
+                        PRIMARY KEY (service, phase, item_id)
+                    )
+                    """
+                )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get_fingerprints(self, service: str) -> dict[int, str]:
+        """
+        Load the fingerprints recorded at the last successful sync of each item.
+
+        Args:
+            service: Service name (e.g., "Sonarr")
+
+        Returns:
+            Mapping of item ID to fingerprint
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id, fingerprint FROM fingerprints WHERE service = ?", (service,)
+            ).fetchall()
+        return dict(rows)
+
+    def save_fingerprint(self, service: str, item_id: int, fingerprint: str) -> None:
+        """
+        Record the fingerprint of an item that was just synced successfully.
+
+        Args:
+            service: Service name (e.g., "Sonarr")
+            item_id: ID of the synced item
+            fingerprint: Fingerprint of the item's files after the sync
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (service, item_id, fingerprint, synced_at) VALUES (?, ?, ?, ?)",
+                (service, item_id, fingerprint, time.time()),
+            )
+
+    def save_checkpoint(self, service: str, phase: str, item_ids: list[int]) -> None:
+        """
+        Record that items completed a phase in the current run.
+
+        Written immediately after each command completes, so an evicted pod loses
+        at most the commands that were in flight.
+
+        Args:
+            service: Service name (e.g., "Sonarr")
+            phase: Phase name ("refresh" or "rename")
+            item_ids: IDs of the items that completed the phase
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (service, phase, item_id, completed_at) VALUES (?, ?, ?, ?)",
+                [(service, phase, item_id, now) for item_id in item_ids],
+            )
+
+    def get_checkpoint(self, service: str, phase: str, max_age_seconds: float) -> set[int]:
+        """
+        Load the items that completed a phase recently enough to be trusted.
+
+        Args:
+            service: Service name (e.g., "Sonarr")
+            phase: Phase name ("refresh" or "rename")
+            max_age_seconds: Ignore checkpoints older than this
+
+        Returns:
+            IDs of the items that completed the phase
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id FROM checkpoints WHERE service = ? AND phase = ? AND completed_at >= ?",
+                (service, phase, time.time() - max_age_seconds),
+            ).fetchall()
+        return {item_id for (item_id,) in rows}
+
+    def clear_checkpoints(self, service: str) -> None:
+        """
+        Forget all checkpoints of a service (a new run starts, or a run finished cleanly).
+
+        Args:
+            service: Service name (e.g., "Sonarr")
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE service = ?", (service,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
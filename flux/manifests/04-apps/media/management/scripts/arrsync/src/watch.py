@@ -0,0 +1,631 @@
+"""
+Filesystem-driven sync for arrSync (``arrsync watch``).
+
+Instead of crawling the whole library on a schedule, watch mode keeps an index
+of every series/movie/artist folder and watches the media volumes. A changed
+file is mapped to the item owning its folder, and once the item's files have
+been quiet for the debounce period only that item is refreshed and renamed.
+
+Changes are detected by periodic mtime scans, or with inotify on filesystems
+where it sees every writer. The media shares are SMB mounts written by tdarr
+nodes on other hosts, and inotify only reports changes made through the local
+mount, so scanning is the default.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import requests
+
+if TYPE_CHECKING:
+    from arrsync import ArrClient, ArrItem
+
+logger = logging.getLogger(__name__)
+
+# A path that matches no item triggers an index rebuild (a new series, say), at most this often
+INDEX_REBUILD_SECONDS = 300.0
+
+# How long the main loop waits for changes before checking debounced items
+POLL_SECONDS = 1.0
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# Only these files can need a refresh/rename; .nfo files and artwork written by a refresh are ignored
+MEDIA_EXTENSIONS = frozenset(
+    {
+        ".avi",
+        ".m2ts",
+        ".m4v",
+        ".mkv",
+        ".mov",
+        ".mp4",
+        ".mpg",
+        ".ts",
+        ".webm",
+        ".wmv",
+        ".aac",
+        ".aiff",
+        ".alac",
+        ".ape",
+        ".dsf",
+        ".flac",
+        ".m4a",
+        ".mp3",
+        ".ogg",
+        ".opus",
+        ".wav",
+        ".wv",
+    }
+)
+
+
+# --- Path index ---
+
+
+@dataclass(frozen=True)
+class ItemRef:
+    """An item together with the service it belongs to."""
+
+    service: str
+    item: "ArrItem"
+
+    @property
+    def key(self) -> tuple[str, int]:
+        """Identity of the item across index rebuilds."""
+        return self.service, self.item.id
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    owner: ItemRef | None = None
+
+
+class PathIndex:
+    """
+    Prefix tree over path components, mapping any file path to the item whose folder contains it.
+
+    Lookups cost one dict access per path component regardless of library size.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _components(path: str) -> list[str]:
+        return [part for part in os.path.normpath(path).split(os.sep) if part]
+
+    def add(self, path: str, owner: ItemRef) -> None:
+        """
+        Register an item folder.
+
+        Args:
+            path: Local path of the item's folder
+            owner: Item owning everything below the folder
+        """
+        node = self._root
+        for part in self._components(path):
+            node = node.children.setdefault(part, _TrieNode())
+        if node.owner is None:
+            self._size += 1
+        node.owner = owner
+
+    def find(self, path: str) -> ItemRef | None:
+        """
+        Find the item owning a path (the deepest registered folder containing it).
+
+        Args:
+            path: Local file or directory path
+
+        Returns:
+            Owning item, or None if the path is outside every item folder
+        """
+        node = self._root
+        owner = None
+        for part in self._components(path):
+            node = node.children.get(part)
+            if node is None:
+                break
+            owner = node.owner or owner
+        return owner
+
+
+# --- Change sources ---
+
+
+class ChangeSource(ABC):
+    """
+    Reports paths of media files created, modified or deleted below a set of roots.
+
+    Attributes:
+        interval: Longest delay between a change and its report, in seconds
+    """
+
+    interval = 0.0
+
+    @abstractmethod
+    def poll(self, timeout: float) -> list[str]:
+        """
+        Wait up to timeout seconds for changes.
+
+        Args:
+            timeout: Maximum time to block in seconds
+
+        Returns:
+            Changed paths (possibly empty)
+        """
+
+    def close(self) -> None:
+        """Release resources held by the source."""
+
+
+def _is_hidden(name: str) -> bool:
+    """Dotfiles are SMB/macOS metadata and partial writes, never media."""
+    return name.startswith(".")
+
+
+def _is_media(name: str) -> bool:
+    """Visible files with a media extension."""
+    return not _is_hidden(name) and os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS
+
+
+class MtimeScanner(ChangeSource):
+    """
+    Detect changes by comparing (mtime, size) snapshots of all media files every interval.
+
+    The first snapshot is taken at construction and serves as the baseline, so
+    only changes after startup are reported.
+    """
+
+    def __init__(self, roots: list[str], interval: float):
+        """
+        Take the baseline snapshot.
+
+        Args:
+            roots: Directories to scan recursively
+            interval: Seconds between scans
+        """
+        self.roots = roots
+        self.interval = interval
+        started = time.monotonic()
+        self._snapshot = self._scan()
+        logger.info(f"Scanned {len(self._snapshot)} files in {time.monotonic() - started:.1f}s")
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Stat every media file below the roots."""
+        snapshot: dict[str, tuple[int, int]] = {}
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if _is_hidden(entry.name):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif _is_media(entry.name) and entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                # Directories can vanish mid-scan while tdarr or the *arr services move files
+                logger.debug(f"Skipping {directory}: {e}")
+        return snapshot
+
+    def poll(self, timeout: float) -> list[str]:
+        remaining = self._next_scan - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            return []
+
+        snapshot = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+        changed = [path for path, signature in snapshot.items() if self._snapshot.get(path) != signature]
+        changed.extend(path for path in self._snapshot.keys() - snapshot.keys())
+        self._snapshot = snapshot
+        return changed
+
+
+class InotifyWatcher(ChangeSource):
+    """
+    Detect changes with Linux inotify, watching every directory below the roots.
+
+    Only sees writes made through this host's mount. Needs one watch per
+    directory (fs.inotify.max_user_watches).
+    """
+
+    def __init__(self, roots: list[str]):
+        """
+        Set up watches for all directories below the roots.
+
+        Args:
+            roots: Directories to watch recursively
+
+        Raises:
+            OSError: If inotify is unavailable or the watch limit is reached
+        """
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._directories: dict[int, str] = {}
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+        logger.info(f"Watching {len(self._directories)} directories with inotify")
+
+    def _watch_tree(self, root: str) -> list[str]:
+        """
+        Watch a directory and its subdirectories.
+
+        Returns:
+            Media files found below the directory (created before its watch existed)
+        """
+        files = []
+        for directory, subdirectories, filenames in os.walk(root):
+            subdirectories[:] = [name for name in subdirectories if not _is_hidden(name)]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"inotify_add_watch {directory}: {os.strerror(errno)}")
+            self._directories[wd] = directory
+            files.extend(os.path.join(directory, name) for name in filenames if _is_media(name))
+        return files
+
+    def _events(self, data: bytes) -> Iterator[tuple[int, int, str]]:
+        """Decode (wd, mask, name) tuples from a read() of the inotify descriptor."""
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            yield wd, mask, name
+
+    def poll(self, timeout: float) -> list[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        for wd, mask, name in self._events(data):
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflowed, some changes were missed (the nightly sync catches them)")
+                continue
+            directory = self._directories.get(wd)
+            if directory is None or not name or _is_hidden(name):
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.extend(self._watch_tree(path))
+                    except OSError as e:
+                        logger.warning(f"Could not watch new directory {path}: {e}")
+                continue
+            if _is_media(name):
+                changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+# --- Daemon ---
+
+
+class Debouncer:
+    """
+    Deduplicating delay queue: each key is released once its quiet period has passed without new events.
+
+    Thread-safe, so webhook handlers and the watch loop can feed the same queue.
+    """
+
+    def __init__(self, quiet_seconds: float):
+        self.quiet_seconds = quiet_seconds
+        self._due: dict[Any, float] = {}
+        self._values: dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._due)
+
+    def touch(self, key: Any, value: Any, quiet_seconds: float | None = None) -> None:
+        """
+        Record an event for a key, restarting its quiet period.
+
+        Args:
+            key: Deduplication key
+            value: Value released for the key (the latest one wins)
+            quiet_seconds: Quiet period for this event (default: the debouncer's)
+        """
+        quiet = self.quiet_seconds if quiet_seconds is None else quiet_seconds
+        with self._lock:
+            self._due[key] = time.monotonic() + quiet
+            self._values[key] = value
+
+    def pop_due(self) -> list[Any]:
+        """Remove and return the values of keys whose quiet period has passed."""
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key, due_at in self._due.items() if due_at <= now]
+            for key in due:
+                del self._due[key]
+            return [self._values.pop(key) for key in due]
+
+
+class WatchDaemon:
+    """
+    Map file changes to items and sync each changed item once its files settle.
+
+    Changes arrive from a ChangeSource polled by run() or from other threads via
+    add_paths()/add_item() (e.g., webhooks). They all land in one deduplicating
+    queue, so an item reported several times is synced once.
+
+    Syncs run in a background thread per service, so watching continues while
+    commands are in flight; items that change during a service's sync are queued
+    for its next one.
+
+    Changes to an item that is syncing, or that synced less than the source's
+    interval plus the debounce period ago, are dropped: they are the sync's own
+    renames (or the change it just handled, reported again by the next scan, when
+    a webhook reported it first). Notifications of a new change pass force=True.
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, "ArrClient"],
+        debounce_seconds: float,
+        path_map: dict[str, str] | None = None,
+    ):
+        """
+        Initialize the daemon and build the path index.
+
+        Args:
+            clients: Map of service name to client
+            debounce_seconds: Quiet period before a changed item is synced
+            path_map: Map of *arr path prefixes to local path prefixes, for volumes
+                mounted at a different path than in the *arr containers
+        """
+        self.clients = clients
+        self.path_map = path_map or {}
+        self._debouncer = Debouncer(debounce_seconds)
+        self._queued: dict[str, dict[int, "ArrItem"]] = {}
+        self._running: dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=len(clients), thread_name_prefix="watch")
+        self._stop = threading.Event()
+        self._index = PathIndex()
+        self._index_lock = threading.Lock()
+        self._item_paths: list[str] = []
+        self._index_built_at = 0.0
+        # Monotonic time each item's latest sync started or finished, for dropping its own changes
+        self._synced_at: dict[tuple[str, int], float] = {}
+        self._synced_lock = threading.Lock()
+        self._recent_seconds = debounce_seconds
+        self._rebuild_index()
+
+    def local_path(self, path: str) -> str:
+        """Translate an *arr path to the local mount using the longest matching prefix."""
+        for arr_prefix in sorted(self.path_map, key=len, reverse=True):
+            if path == arr_prefix or path.startswith(arr_prefix.rstrip("/") + "/"):
+                return self.path_map[arr_prefix] + path[len(arr_prefix) :]
+        return path
+
+    def roots(self) -> list[str]:
+        """Library root folders (parents of item folders) that exist locally."""
+        roots = {os.path.dirname(path) for path in self._item_paths}
+        return sorted(root for root in roots if os.path.isdir(root))
+
+    def _rebuild_index(self) -> None:
+        """List every service's items and rebuild the path index from their folders."""
+        index = PathIndex()
+        item_paths = []
+        for service, client in self.clients.items():
+            try:
+                for item in client.iter_items():
+                    if item.path:
+                        path = self.local_path(item.path)
+                        index.add(path, ItemRef(service, item))
+                        item_paths.append(path)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"[{client.config.name}] Could not list items for the path index: {e}")
+        self._index = index
+        self._item_paths = item_paths
+        self._index_built_at = time.monotonic()
+        logger.info(f"Indexed {len(index)} item folders")
+
+    def add_paths(self, paths: Iterable[str], quiet_seconds: float | None = None, force: bool = False) -> int:
+        """
+        Queue the items owning changed paths, restarting their quiet period.
+
+        Paths outside every known item folder trigger an index rebuild (rate limited)
+        in case they belong to a newly added item.
+
+        Args:
+            paths: Changed file paths (local paths, see local_path())
+            quiet_seconds: Quiet period before syncing (default: the debounce period)
+            force: Queue items even if they synced recently (for notifications of a new change)
+
+        Returns:
+            Number of paths that matched an item
+        """
+        paths = list(paths)
+        unknown = [path for path in paths if not self._touch(path, quiet_seconds, force)]
+        if unknown:
+            with self._index_lock:
+                if time.monotonic() - self._index_built_at >= INDEX_REBUILD_SECONDS:
+                    logger.info(f"{len(unknown)} changed files outside known item folders, rebuilding the index")
+                    self._rebuild_index()
+            unknown = [path for path in unknown if not self._touch(path, quiet_seconds, force)]
+        for path in unknown:
+            logger.debug(f"Ignoring change outside item folders: {path}")
+        return len(paths) - len(unknown)
+
+    def add_item(self, service: str, item: "ArrItem", quiet_seconds: float | None = None, force: bool = False) -> bool:
+        """
+        Queue an item directly, restarting its quiet period.
+
+        Args:
+            service: Service name (key in clients)
+            item: Item to sync
+            quiet_seconds: Quiet period before syncing (default: the debounce period)
+            force: Queue the item even if it synced recently (for notifications of a new change)
+
+        Returns:
+            False if the item was dropped because it synced recently
+        """
+        if not force and self._recently_synced((service, item.id)):
+            logger.debug(f"{service}: {item.name} changed by a recent sync")
+            return False
+        self._debouncer.touch((service, item.id), ItemRef(service, item), quiet_seconds)
+        return True
+
+    def _touch(self, path: str, quiet_seconds: float | None, force: bool = False) -> bool:
+        """
+        Record a change for the item owning a path.
+
+        Returns:
+            False if no item owns the path
+        """
+        owner = self._index.find(path)
+        if owner is None:
+            return False
+        if not force and self._recently_synced(owner.key):
+            logger.debug(f"{path} changed by a recent sync ({owner.service}: {owner.item.name})")
+            return True
+        logger.debug(f"{path} changed ({owner.service}: {owner.item.name})")
+        self._debouncer.touch(owner.key, owner, quiet_seconds)
+        return True
+
+    def _recently_synced(self, key: tuple[str, int]) -> bool:
+        """Whether an item is syncing or synced within the last recent-sync window."""
+        with self._synced_lock:
+            synced_at = self._synced_at.get(key)
+        return synced_at is not None and time.monotonic() - synced_at < self._recent_seconds
+
+    def _mark_synced(self, service: str, items: list["ArrItem"]) -> None:
+        """Record the current time as the items' sync time and forget syncs older than the window."""
+        now = time.monotonic()
+        with self._synced_lock:
+            for item in items:
+                self._synced_at[service, item.id] = now
+            expired = [key for key, synced_at in self._synced_at.items() if now - synced_at >= self._recent_seconds]
+            for key in expired:
+                del self._synced_at[key]
+
+    def _dispatch(self) -> None:
+        """Start syncs for settled items on services that are not already syncing."""
+        for ref in self._debouncer.pop_due():
+            self._queued.setdefault(ref.service, {})[ref.item.id] = ref.item
+        for service in list(self._queued):
+            running = self._running.get(service)
+            if running is not None and not running.done():
+                continue
+            items = list(self._queued.pop(service).values())
+            # Marked before the sync starts, so no change reported in between queues the items again
+            self._mark_synced(service, items)
+            self._running[service] = self._executor.submit(self._sync, service, items)
+
+    def _sync(self, service: str, items: list["ArrItem"]) -> None:
+        """Refresh and rename changed items of one service."""
+        client = self.clients[service]
+        names = ", ".join(item.name for item in items[:5]) + (", ..." if len(items) > 5 else "")
+        logger.info(f"[{client.config.name}] Syncing {len(items)} changed items: {names}")
+        try:
+            failed_items = client.sync_items(items)
+        except Exception as e:
+            logger.error(f"[{client.config.name}] Targeted sync aborted: {e}", exc_info=True)
+            return
+        finally:
+            # The window restarts when the sync ends, for the scan that sees its renames
+            self._mark_synced(service, items)
+        if failed_items:
+            logger.warning(f"[{client.config.name}] Failed items: {', '.join(failed_items)}")
+
+    def run(self, source: ChangeSource | None) -> None:
+        """
+        Process changes until stop() is called.
+
+        Args:
+            source: Change source watching roots(), or None to only process
+                changes queued via add_paths()/add_item()
+        """
+        # A scan reports a sync's own renames up to one interval after it finished
+        self._recent_seconds = self._debouncer.quiet_seconds + (source.interval if source is not None else 0.0)
+        logger.info(f"Watching for changes (debounce: {self._debouncer.quiet_seconds:.0f}s)")
+        try:
+            while not self._stop.is_set():
+                if source is None:
+                    self._stop.wait(POLL_SECONDS)
+                elif paths := source.poll(POLL_SECONDS):
+                    self.add_paths(paths)
+                self._dispatch()
+        finally:
+            if source is not None:
+                source.close()
+            self._executor.shutdown(wait=True)
+            logger.info("Stopped watching")
+
+    def stop(self) -> None:
+        """Ask run() to return after the current poll; running syncs are finished first."""
+        self._stop.set()
+
+
+def create_change_source(mode: str, roots: list[str], scan_interval: float) -> ChangeSource | None:
+    """
+    Create the change source for a watch mode, falling back to scanning if inotify fails.
+
+    Args:
+        mode: "inotify", "scan", or "none" (changes only arrive via webhooks)
+        roots: Directories to watch
+        scan_interval: Seconds between scans in scan mode
+
+    Returns:
+        Change source, or None for mode "none"
+    """
+    if mode == "none":
+        return None
+    if mode == "inotify":
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}), falling back to mtime scans")
+    return MtimeScanner(roots, scan_interval)
@@ -0,0 +1,217 @@
+"""
+Webhook receiver for arrSync watch mode.
+
+Accepts two kinds of notifications and turns them into targeted syncs:
+
+- POST /webhook/tdarr: sent by a tdarr flow (e.g., a "Send Web Request" step after
+  the file is replaced) with the path of the transcoded file. The path is mapped
+  to its item through the watch daemon's path index.
+- POST /webhook/<instance>: Sonarr/Radarr/Lidarr Connect "Webhook" notifications,
+  where <instance> is the lowercased instance name with runs of other characters
+  replaced by "-" (e.g., /webhook/sonarr, /webhook/sonarr-4k). Download (including
+  upgrades) and Rename events queue the item they refer to.
+
+Both feed the watch daemon's deduplicating queue, which drains into the regular
+refresh/rename logic. The daemon remembers recent syncs, so the scan that later
+sees a file a webhook already reported does not sync its item a second time.
+
+GET /healthz answers probes and GET /metrics serves the sync metrics in the
+Prometheus text format.
+"""
+
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from watch import WatchDaemon
+
+logger = logging.getLogger(__name__)
+
+# Connect event types that can leave files needing a refresh/rename
+SYNC_EVENTS = frozenset({"Download", "Upgrade", "Rename"})
+
+# tdarr reports a finished file once; wait only long enough to coalesce a burst (a season pack)
+WEBHOOK_QUIET_SECONDS = 5.0
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def tdarr_paths(payload: Any) -> list[str]:
+    """
+    Collect file paths from a tdarr webhook body.
+
+    tdarr has no fixed webhook schema, so the common shapes are accepted: a path
+    under "file", "filePath" or "path", a list under "files", or a tdarr file
+    object (whose "_id" is its path), at the top level or nested under
+    "inputFileObj"/"originalLibraryFile".
+
+    Args:
+        payload: Decoded request body
+
+    Returns:
+        File paths mentioned in the payload
+    """
+    if isinstance(payload, str):
+        return [payload]
+    if isinstance(payload, list):
+        return [path for entry in payload for path in tdarr_paths(entry)]
+    if not isinstance(payload, dict):
+        return []
+
+    paths = [payload[key] for key in ("file", "filePath", "path", "_id") if isinstance(payload.get(key), str)]
+    paths.extend(tdarr_paths(payload.get("files", [])))
+    for key in ("inputFileObj", "originalLibraryFile"):
+        if isinstance(payload.get(key), dict):
+            paths.extend(tdarr_paths(payload[key]))
+    return list(dict.fromkeys(paths))
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """HTTP handler routing webhook requests into the watch daemon."""
+
+    protocol_version = "HTTP/1.1"
+    server: "WebhookServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _send_json(self, payload: Any, status: int = 200, close: bool = False) -> None:
+        """Send a JSON response; close=True ends the connection (e.g. when the request body was not read)."""
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self, query: dict[str, list[str]]) -> bool:
+        """Check the shared token (?token= or X-Arrsync-Token header) when one is configured."""
+        token = self.server.token
+        if not token:
+            return True
+        supplied = self.headers.get("X-Arrsync-Token") or next(iter(query.get("token", [])), "")
+        return hmac.compare_digest(supplied.encode(), token.encode())
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/healthz":
+            self._send_json({"status": "ok"})
+        elif path == "/metrics":
+            data = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json({"message": "Not found"}, 404)
+
+    def do_POST(self) -> None:
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        # Responses sent before the body is read close the connection, so the unread
+        # body is never parsed as the next request on a keep-alive connection
+        if len(segments) != 2 or segments[0] != "webhook":
+            self._send_json({"message": "Not found"}, 404, close=True)
+            return
+        if not self._authorized(parse_qs(parts.query)):
+            self._send_json({"message": "Unauthorized"}, 401, close=True)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json({"message": "Invalid Content-Length"}, 400, close=True)
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json({"message": "Payload too large"}, 413, close=True)
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json({"message": "Body is not valid JSON"}, 400)
+            return
+
+        source = segments[1].lower()
+        if source == "tdarr":
+            self._send_json(self._handle_tdarr(payload), 202)
+        elif source in self.server.services:
+            self._send_json(self._handle_connect(self.server.services[source], payload), 202)
+        else:
+            self._send_json({"message": f"Unknown webhook source {segments[1]}"}, 404)
+
+    def _handle_tdarr(self, payload: Any) -> dict[str, Any]:
+        """Queue the items owning the files tdarr reports."""
+        watcher = self.server.watcher
+        paths = [watcher.local_path(path) for path in tdarr_paths(payload)]
+        # tdarr reports a file it just replaced, a new change even if the item synced recently
+        queued = watcher.add_paths(paths, WEBHOOK_QUIET_SECONDS, force=True)
+        logger.info(f"tdarr webhook: {queued}/{len(paths)} files matched an item")
+        return {"paths": len(paths), "queued": queued}
+
+    def _handle_connect(self, service: str, payload: Any) -> dict[str, Any]:
+        """Queue the item of a Sonarr/Radarr/Lidarr Connect event."""
+        if not isinstance(payload, dict):
+            return {"event": "", "queued": 0}
+        event = payload.get("eventType", "")
+        if event == "Download" and payload.get("isUpgrade"):
+            event = "Upgrade"
+        if event not in SYNC_EVENTS:
+            # Includes "Test", sent when the connection is saved in the *arr UI
+            logger.debug(f"[{service}] Ignoring {event or 'unknown'} webhook event")
+            return {"event": event, "queued": 0}
+
+        item = self.server.watcher.clients[service].item_from_event(payload)
+        if item is None:
+            logger.warning(f"[{service}] {event} webhook event has no item")
+            return {"event": event, "queued": 0}
+        # Downloads bring new files; a Rename right after a sync is usually the sync's own rename
+        if not self.server.watcher.add_item(service, item, WEBHOOK_QUIET_SECONDS, force=event != "Rename"):
+            logger.info(f"[{service}] {event} webhook: {item.name} synced recently, ignoring")
+            return {"event": event, "queued": 0}
+        logger.info(f"[{service}] {event} webhook: queued {item.name}")
+        return {"event": event, "queued": 1}
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server feeding webhooks into a WatchDaemon.
+
+    Attributes:
+        watcher: Watch daemon whose queue receives the items
+        token: Shared secret required on every webhook (None: no authentication)
+        services: Map of URL segment (e.g., "sonarr-4k") to instance name (e.g., "Sonarr 4K")
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], watcher: WatchDaemon, services: dict[str, str], token: str | None = None
+    ):
+        super().__init__(address, WebhookHandler)
+        self.watcher = watcher
+        self.token = token
+        self.services = services
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="webhook", daemon=True)
+        self._thread.start()
+        host, port = self.server_address[:2]
+        logger.info(f"Listening for webhooks on http://{host}:{port}/webhook/{{tdarr,{','.join(self.services)}}}")
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()